@@ -0,0 +1,102 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-analyze_bench.py
+        about: benchmark: hn.py analyze (hn_analyze.HistoryIndex) over tens of thousands of synthetic daily snapshots
+        title: Hacker News Scraper history analytics benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 01
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : N_FILES snapshots (raw / postprocessed, from hn.2020.05.03.raw.txt); ingest with 1 process vs. the pool; re-run (index kept); reports
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_analyze.py
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-analyze_bench.py
+==============================================================================
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from hn_analyze import HistoryIndex
+from hn_output import Translator, read_snapshot
+
+N_FILES = 20000                  # 2 snapshots a day (raw + postprocessed): ~27 years
+STORIES_PER_DAY = 10
+NEW_PER_DAY = 6                  # the rest carried over from the day before
+
+hn_dict = {
+         ',' : ''
+        ,'"' : ''
+        ,"\\u201c" : '"'
+        ,"\\u201d" : '"'
+        ,"\\u2018" : "'"
+        ,"\\u2019" : "'"
+        ,"\\u2013" : "-"
+        }
+
+here = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(here, 'hn.2020.05.03.raw.txt'), 'r') as f:
+    records = read_snapshot(f.read())
+translator = Translator.for_table(hn_dict)
+
+
+def write_snapshots(root):
+    day = date(1995, 1, 1)
+    for n in range(N_FILES // 2):
+        lines = []
+        for i, record in enumerate(records[:STORIES_PER_DAY]):
+            ## ids shift by NEW_PER_DAY a day: a story stays on the page for a couple of days, gaining points
+            serial = n * NEW_PER_DAY + i
+            r = dict(record, hn_url='https://news.ycombinator.com/item?id={}'.format(1000000 + serial), votes=record['votes'] + 7 * i)
+            lines.append(json.dumps(r, indent=2))
+        text = '\n'.join(lines) + '\n'
+        subdir = os.path.join(root, str(day.year))
+        os.makedirs(subdir, exist_ok=True)
+        stem = os.path.join(subdir, 'hn.{}'.format(day.strftime('%Y.%m.%d')))
+        with open(stem + '.raw.txt', 'w') as f:
+            f.write(text)
+        with open(stem + '.postprocessed.txt', 'w') as f:
+            f.write(translator(text))
+        day += timedelta(days=1)
+
+
+with tempfile.TemporaryDirectory() as root:
+    t0 = time.perf_counter()
+    write_snapshots(root)
+    print('{} snapshot files written: {:.1f} s; {} CPU(s)\n'.format(N_FILES, time.perf_counter() - t0, os.cpu_count()))
+
+    results = []
+    for label, workers in [('1 process', 1), ('process pool', None)]:
+        history = HistoryIndex(os.path.join(root, 'index.{}.json'.format(workers)))
+        t0 = time.perf_counter()
+        read = history.update(root, workers=workers)
+        history.save()
+        print('{:>34}: {:6.2f} s  ({} files, {} stories)'.format('ingest, ' + label, time.perf_counter() - t0, read, len(history.stories)))
+        results.append(history.stories)
+    assert results[0] == results[1]
+
+    t0 = time.perf_counter()
+    history = HistoryIndex(os.path.join(root, 'index.None.json'))
+    read = history.update(root)
+    print('{:>34}: {:6.2f} s  ({} files read)'.format('re-run (index kept)', time.perf_counter() - t0, read))
+    assert read == 0
+
+    t0 = time.perf_counter()
+    history.top_domains()
+    history.velocity()
+    history.keyword_trends(['apple', 'google', 'recursion'])
+    print('{:>34}: {:6.2f} s'.format('reports', time.perf_counter() - t0))
+
+# ============================================================================
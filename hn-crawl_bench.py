@@ -0,0 +1,162 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-crawl_bench.py
+        about: benchmark: multi-page Hacker News crawl (hn_fetch.py) against the local HTTP stand-in (hn_standin.py)
+        title: Hacker News Scraper crawl benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 06
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : one page vs. 20+ pages (sequential, concurrent) with a simulated per-request latency; dedupe check
+    * v02 : response cache (hn_fetch.ResponseCache): cold vs. warm (within TTL: no request, no parse) vs. revalidated (304)
+    * v03 : comment threads (hn_comments.fetch_threads): one worker vs. a bounded pool, over synthetic API items
+    * v04 : hn.py's shipped settings (crawl_per_host, fetch_* --> FetchScheduler) on its documented 20-page crawl; fetch_burst = 4 (hn.py v23)
+    * v05 : comment threads: a thread with a comment that can not be fetched is left out (hn_comments.py v02)
+    * v06 : shipped settings crawled with hn.parser_backend (was always 'stream'); each backend at crawl_per_host = 20, bounded by its parse time
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_fetch.py
+    * /mnt/Vancouver/programming/python/scripts/hn_standin.py
+    * /mnt/Vancouver/programming/python/scripts/hn_comments.py
+    * /mnt/Vancouver/programming/python/scripts/hn.py             ## << crawl_* / fetch_* settings
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-crawl_bench.py
+==============================================================================
+"""
+# https://stackoverflow.com/questions/879173/how-to-ignore-deprecation-warnings-in-python
+def warn(*args, **kwargs):
+    pass
+import warnings
+warnings.warn = warn
+warnings.filterwarnings("ignore", category=UserWarning)
+# ============================================================================
+
+import math
+import tempfile
+import time
+import hn
+import hn_standin
+from hn_comments import fetch_threads
+from hn_fetch import ResponseCache, crawl, make_session
+from hn_parse import parse_stories, synthetic_page
+from hn_schedule import FetchScheduler
+
+DELAY = 0.25                                   # simulated network latency per page (s)
+ENDPOINTS = ('news', 'newest', 'best', 'ask', 'show')
+PAGES = 5                                      # 5 endpoints x 5 pages = 25 pages
+PER_HOST = 25
+THREAD_DELAY = 0.01                            # per API item (s)
+THREAD_IDS = range(23000001, 23000011)         # 10 synthetic threads, 21 ... 30 comments each
+THREAD_WORKERS = 8
+
+server, base_url = hn_standin.start(delay=DELAY)
+
+
+def timed(backend='stream', **kwargs):
+    session = make_session(pool_size=kwargs.get('per_host', 4))
+    t0 = time.perf_counter()
+    stories = crawl(session, base_url=base_url, backend=backend, **kwargs)
+    return time.perf_counter() - t0, stories
+
+
+def parse_time(backend, repeat=5):
+    """ Best time (s) to parse one stand-in page with the backend. """
+    html = synthetic_page(hn_standin.ROWS_PER_PAGE)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parse_stories(html, backend=backend)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+# ----------------------------------------------------------------------------
+
+one_page, stories = timed()
+print('{:>34}: {:6.2f} s  ({} stories)'.format('1 page (news)', one_page, len(stories)))
+
+sequential, stories = timed(endpoints=ENDPOINTS, pages=PAGES, workers=1, per_host=1)
+print('{:>34}: {:6.2f} s  ({} stories)'.format('{} pages, sequential'.format(len(ENDPOINTS) * PAGES), sequential, len(stories)))
+
+concurrent, stories = timed(endpoints=ENDPOINTS, pages=PAGES, workers=PER_HOST, per_host=PER_HOST)
+print('{:>34}: {:6.2f} s  ({} stories)'.format('{} pages, concurrent (per_host={})'.format(len(ENDPOINTS) * PAGES, PER_HOST), concurrent, len(stories)))
+
+## 'news' and 'best' serve the same synthetic ids (hn_standin.py): 4 distinct listings x 5 pages x 30 rows:
+assert len(stories) == 4 * PAGES * hn_standin.ROWS_PER_PAGE
+assert len(set(story.id for story in stories)) == len(stories)
+print('\nconcurrent / 1 page: {:.2f}x'.format(concurrent / one_page))
+
+# ----------------------------------------------------------------------------
+## RESPONSE CACHE:
+## ---------------
+
+print()
+with tempfile.TemporaryDirectory() as cache_dir:
+    cache = ResponseCache(cache_dir, ttl=3600)
+    cold, stories = timed(endpoints=ENDPOINTS, pages=PAGES, workers=PER_HOST, per_host=PER_HOST, cache=cache)
+    hits = sum(server.hits.values())
+    warm, warm_stories = timed(endpoints=ENDPOINTS, pages=PAGES, workers=PER_HOST, per_host=PER_HOST, cache=cache)
+    assert warm_stories == stories and sum(server.hits.values()) == hits
+    cache.ttl = 0
+    revalidated, stories_304 = timed(endpoints=ENDPOINTS, pages=PAGES, workers=PER_HOST, per_host=PER_HOST, cache=cache)
+    assert stories_304 == stories
+    print('{:>34}: {:6.2f} s'.format('cache cold', cold))
+    print('{:>34}: {:6.3f} s  (no requests)'.format('cache warm (within TTL)', warm))
+    print('{:>34}: {:6.2f} s  (304 Not Modified)'.format('cache revalidated (TTL expired)', revalidated))
+
+# ----------------------------------------------------------------------------
+## SHIPPED SETTINGS:
+## -----------------
+
+## hn.py's example crawl (5 endpoints x 4 pages), through a FetchScheduler built as hn.open_fetch() builds it; the target is about one
+## page's time:
+print()
+runs = [('shipped settings', hn.parser_backend, hn.crawl_per_host, hn.fetch_burst)]
+runs += [("parser_backend = '{}'".format(backend), backend, 20, hn.fetch_burst) for backend in ['lxml', 'stream', 'html.parser'] if backend != hn.parser_backend]
+runs += [('crawl_per_host = 4 (hn.py v26)', hn.parser_backend, 4, hn.fetch_burst), ('fetch_burst = 4 (hn.py v23)', hn.parser_backend, hn.crawl_per_host, 4)]
+for label, backend, per_host, burst in runs:
+    scheduler = FetchScheduler(rate=hn.fetch_rate, burst=burst, timeout=hn.fetch_timeout, deadline=hn.fetch_deadline, retries=hn.fetch_retries,
+                               backoff=hn.fetch_backoff, failures=hn.breaker_failures, reset=hn.breaker_reset)
+    elapsed, stories = timed(backend, endpoints=ENDPOINTS, pages=4, workers=per_host, per_host=per_host, scheduler=scheduler)  ## as hn.run()
+    ## no faster than the network (ceil(20 / per_host) round-trips), no slower than the rate limit (20 - burst requests at fetch_rate / s);
+    ## the 20 parses hold the GIL (as does the in-process stand-in server), so they add up:
+    floor = max(math.ceil(20 / per_host) * DELAY, (20 - burst) / hn.fetch_rate)
+    parsing = 20 * parse_time(backend)
+    print('{:>34}: {:6.2f} s  ({:.1f} x 1 page; >= {:.2f} s + {:.2f} s parsing)  {}, per_host={}, burst={}, rate={:g} / s'.format(
+        label, elapsed, elapsed / one_page, floor, parsing, backend, per_host, burst, hn.fetch_rate))
+    assert floor * 0.95 <= elapsed <= floor + 2 * parsing + 2 * DELAY, (label, elapsed)
+
+server.shutdown()
+
+# ----------------------------------------------------------------------------
+## COMMENT THREADS:
+## ----------------
+
+print()
+server, base_url = hn_standin.start(delay=THREAD_DELAY)
+results = []
+for workers in [1, THREAD_WORKERS]:
+    session = make_session(pool_size=workers)
+    t0 = time.perf_counter()
+    results.append(fetch_threads(session, THREAD_IDS, api_url=base_url + 'v0/', workers=workers))
+    print('{:>34}: {:6.2f} s  ({} items)'.format('{} threads, {} worker(s)'.format(len(THREAD_IDS), workers), time.perf_counter() - t0,
+                                                 sum(server.hits.values()) // len(results)))
+assert results[0] == results[1]
+for hn_id, thread in results[0].items():
+    size = hn_standin.synthetic_thread_size(hn_id)
+    assert thread.count == size - size // 7            # every 7th comment deleted
+## one worker, so the requests come in order: the story, then a failed comment --> the thread is left out (not stored undercounted)
+server.inject(['ok', '503'])
+failed = fetch_threads(make_session(pool_size=1), THREAD_IDS[:1], api_url=base_url + 'v0/', workers=1)
+print('{:>34}: {} thread(s) returned'.format('a comment not fetched (503)', len(failed)))
+assert failed == {}
+server.shutdown()
+
+# ============================================================================
@@ -0,0 +1,81 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-filter_bench.py
+        about: benchmark: compiled keep / drop filter (hn_filter.py) vs. the old per-keyword list comprehensions in hn.py
+        title: Hacker News Scraper filter benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 02
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : 3,000 synthetic stories x {4, 400, 4,000} exclusion keywords; same keep / drop decisions checked
+    * v02 : the shipped hn_filter.json too, checked no slower than the hn.py (v12) if; best of 5 runs
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_filter.py
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-filter_bench.py
+==============================================================================
+"""
+
+import os
+import random
+import string
+import time
+from hn_filter import StoryFilter
+from hn_parse import parse_stories, synthetic_page
+
+STORIES = parse_stories(synthetic_page(3000), backend='stream')
+KEYWORD_COUNTS = [4, 400, 4000]
+
+random.seed(20201018)
+
+
+def keywords(n):
+    words = ['dead', 'flagged', 'youtube', 'wikipedia', 'number 17', 'example3.']
+    while len(words) < n:
+        words.append(''.join(random.choice(string.ascii_lowercase) for _ in range(random.randint(4, 12))))
+    return words[:n]
+
+
+def legacy_keep(exclusions, story):
+    """ The hn.py (v12) if. """
+    return (story.points > 5) and \
+        (story.comments > 1) and \
+        (not [w for w in exclusions if w in story.title.lower()]) and \
+        (not [w for w in exclusions if w in story.href.lower()])
+
+
+def best_ms(fn, repeat=5):
+    """ (best time (ms), result) of repeat runs. """
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1e3)
+    return min(times), result
+
+
+print('{:>20}  {:>12}  {:>14}  {:>14}'.format('keywords', 'compile (ms)', 'compiled (ms)', 'legacy (ms)'))
+shipped = StoryFilter.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hn_filter.json'))
+for n in ['hn_filter.json'] + KEYWORD_COUNTS:
+    exclusions = shipped.rules['exclude_keywords'] if n == 'hn_filter.json' else keywords(n)
+    t0 = time.perf_counter()
+    story_filter = shipped if n == 'hn_filter.json' else StoryFilter({'exclude_keywords': exclusions})
+    t1 = time.perf_counter()
+    t_compiled, kept = best_ms(lambda: [story_filter.keep(s.title, s.href, s.points, s.comments) for s in STORIES])
+    t_legacy, legacy = best_ms(lambda: [legacy_keep(exclusions, s) for s in STORIES])
+    assert kept == legacy
+    print('{:>20}  {:>12.2f}  {:>14.2f}  {:>14.2f}'.format(n if isinstance(n, str) else n, (t1 - t0) * 1e3, t_compiled, t_legacy))
+    if n == 'hn_filter.json':
+        ## the default rules: no slower than the hand-written if they replace
+        assert t_compiled <= t_legacy * 1.1, (t_compiled, t_legacy)
+
+# ============================================================================
@@ -0,0 +1,120 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-parse_bench.py
+        about: benchmark: Hacker News story extraction (hn_parse.py) over synthetic front pages
+        title: Hacker News Scraper parser benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 02
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : single-pass extractor vs. the old per-item soup.select('td.subtext') rescans; 30 / 300 / 3,000 rows
+    * v02 : parser backend timing comparison ('html.parser' | 'lxml' | 'stream'); identical-records check
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_parse.py
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-parse_bench.py
+
+    The time per row of the single-pass extractor should stay ~constant as the page grows (linear scaling); the old
+    rescan approach grows with the page size (quadratic), so it is only timed up to LEGACY_MAX_ROWS.
+
+    The parser backends are first checked against the SAMPLE SOURCE HTML documented at the top of hn.py (and against each other
+    on the synthetic pages): all of them must return identical Story records.
+==============================================================================
+"""
+# https://stackoverflow.com/questions/879173/how-to-ignore-deprecation-warnings-in-python
+def warn(*args, **kwargs):
+    pass
+import warnings
+warnings.warn = warn
+warnings.filterwarnings("ignore", category=UserWarning)
+# ============================================================================
+
+import os
+import time
+from bs4 import BeautifulSoup
+from hn_parse import BACKENDS, Story, iter_stories, parse_stories, synthetic_page
+
+ROWS = [30, 300, 3000]
+LEGACY_MAX_ROWS = 300
+
+
+def legacy_extract(soup):
+    """ The hn.py (v07) loop: one soup.select('td.subtext') document scan per story. """
+    out = []
+    for idx, item in enumerate(soup.select('.storylink')):
+        hn_element = soup.select('td.subtext')
+        out.append((item.get('href'), hn_element[idx].get_text()))
+    return out
+
+
+def best_of(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def hn_sample_html():
+    """ The commented SAMPLE SOURCE HTML block near the top of hn.py (read as text; importing hn.py would scrape). """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hn.py')
+    with open(path, 'r') as f:
+        text = f.read()
+    block = text.split('## SAMPLE SOURCE HTML', 1)[1].split('## INITIALIZATIONS', 1)[0]
+    lines = [line[2:] for line in block.splitlines()[1:] if line.startswith('# ')]
+    return '<table>' + '\n'.join(lines) + '</table>'
+
+# ----------------------------------------------------------------------------
+## IDENTICAL RECORDS:
+## ------------------
+
+sample_expected = [Story(id='22897846',
+                         title='Deep Sea Squid Communicate by Glowing Like E-Readers',
+                         href='https://www.npr.org/2020/04/17/820707276/deep-sea-squid-communicate-by-glowing-like-e-readers',
+                         points=77, comments=24, age='3 hours ago')]
+sample = hn_sample_html()
+page = synthetic_page(300)
+for backend in BACKENDS:
+    assert parse_stories(sample, backend=backend) == sample_expected, backend
+    assert parse_stories(page, backend=backend) == parse_stories(page), backend
+print('backends {}: identical records (hn.py sample markup; {} synthetic rows)\n'.format(', '.join(BACKENDS), 300))
+
+# ----------------------------------------------------------------------------
+## SCALING:
+## --------
+
+print('{:>6}  {:>14}  {:>14}  {:>14}  {:>14}'.format('rows', 'single (ms)', 'us/row', 'legacy (ms)', 'us/row'))
+for n in ROWS:
+    soup = BeautifulSoup(synthetic_page(n), 'html.parser')
+    assert len(list(iter_stories(soup))) == n
+    single = best_of(lambda: list(iter_stories(soup)))
+    if n <= LEGACY_MAX_ROWS:
+        legacy = best_of(lambda: legacy_extract(soup), repeat=1)
+        legacy_cols = '{:>14.2f}  {:>14.1f}'.format(legacy * 1e3, legacy * 1e6 / n)
+    else:
+        legacy_cols = '{:>14}  {:>14}'.format('-', '-')
+    print('{:>6}  {:>14.2f}  {:>14.1f}  {}'.format(n, single * 1e3, single * 1e6 / n, legacy_cols))
+
+# ----------------------------------------------------------------------------
+## BACKENDS (parse_stories: HTML text --> Story records, including the tree build):
+## ---------------------------------------------------------------------------------
+
+print()
+print('{:>6}  '.format('rows') + '  '.join('{:>14}'.format(backend + ' (ms)') for backend in BACKENDS))
+for n in ROWS:
+    html = synthetic_page(n)
+    times = [best_of(lambda: parse_stories(html, backend=backend)) for backend in BACKENDS]
+    print('{:>6}  '.format(n) + '  '.join('{:>14.2f}'.format(t * 1e3) for t in times))
+
+# ============================================================================
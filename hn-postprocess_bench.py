@@ -0,0 +1,110 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-postprocess_bench.py
+        about: micro-benchmark: hn.txt postprocessing (hn_dict substitutions) -- old multiple_replace() vs. hn_output.Translator
+        title: Hacker News Scraper postprocessing benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 01
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : large synthetic hn.txt (hn.2020.05.03.raw.txt, repeated); per-line calls, whole file, streaming write + old read-back / rewrite
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_output.py
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-postprocess_bench.py
+==============================================================================
+"""
+
+import os
+import re
+import tempfile
+import time
+from hn_output import Translator, TranslatingWriter
+
+REPEAT = 2000              # copies of the sample raw output (~8 MB)
+
+hn_dict = {
+         ',' : ''
+        ,'"' : ''
+        ,"\\u201c" : '"'
+        ,"\\u201d" : '"'
+        ,"\\u2018" : "'"
+        ,"\\u2019" : "'"
+        ,"\\u2013" : "-"
+        }
+
+
+def multiple_replace(dict, text):
+    """ hn.py (v13) """
+    # Create a regular expression  from the dictionary keys:
+    regex = re.compile("(%s)" % "|".join(map(re.escape, dict.keys())))
+    # For each match, look-up corresponding value in dictionary:
+    return regex.sub(lambda mo: dict[mo.string[mo.start():mo.end()]], text)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+# ----------------------------------------------------------------------------
+
+here = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(here, 'hn.2020.05.03.raw.txt'), 'r') as f:
+    sample = f.read()
+with open(os.path.join(here, 'hn.2020.05.03.postprocessed.txt'), 'r') as f:
+    assert Translator.for_table(hn_dict)(sample) == f.read()
+
+text = sample * REPEAT
+lines = text.splitlines(keepends=True)
+translator = Translator.for_table(hn_dict)
+print('synthetic hn.txt: {:.1f} MB, {} lines\n'.format(len(text) / 2**20, len(lines)))
+
+t_old, expected = timed(lambda: multiple_replace(hn_dict, text))
+t_new, result = timed(lambda: translator(text))
+assert result == expected
+print('{:>40}: {:8.1f} ms'.format('whole file, multiple_replace()', t_old * 1e3))
+print('{:>40}: {:8.1f} ms'.format('whole file, Translator', t_new * 1e3))
+
+t_old, _ = timed(lambda: [multiple_replace(hn_dict, line) for line in lines])
+t_new, _ = timed(lambda: [Translator.for_table(hn_dict)(line) for line in lines])
+print('{:>40}: {:8.1f} ms'.format('per line, multiple_replace()', t_old * 1e3))
+print('{:>40}: {:8.1f} ms'.format('per line, Translator.for_table()', t_new * 1e3))
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'hn.txt')
+
+    def write_then_rewrite():
+        """ hn.py (v13): write, read back, substitute, rewrite """
+        with open(path, 'w') as f:
+            for line in lines:
+                f.write(line)
+        with open(path, 'r') as f:
+            new_text = multiple_replace(hn_dict, f.read())
+        with open(path, 'w') as f:
+            f.write(new_text)
+
+    def streaming():
+        with open(path, 'w') as f:
+            out = TranslatingWriter(f, translator)
+            for line in lines:
+                out.write(line)
+            out.flush()
+
+    t_old, _ = timed(write_then_rewrite)
+    t_new, _ = timed(streaming)
+    with open(path, 'r') as f:
+        assert f.read() == expected
+    print('{:>40}: {:8.1f} ms'.format('write + read-back / rewrite', t_old * 1e3))
+    print('{:>40}: {:8.1f} ms'.format('TranslatingWriter (one pass)', t_new * 1e3))
+
+# ============================================================================
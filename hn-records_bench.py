@@ -0,0 +1,144 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-records_bench.py
+        about: benchmark: story records -- per-story dicts (hn.py v19) vs. Story namedtuples vs. StoryRecord (__slots__) vs. StoryBatch (columns)
+        title: Hacker News Scraper records benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 02
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : memory (tracemalloc) per layout; filter + sort: dicts / itemgetter('age (h)') vs. StoryBatch (column-wise thresholds, argsort)
+    * v02 : the filter step alone: StoryFilter.reject per story vs. StoryBatch.reject (columns)
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_records.py
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-records_bench.py
+==============================================================================
+"""
+
+import gc
+import re
+import time
+import tracemalloc
+from operator import itemgetter
+from hn_filter import StoryFilter
+from hn_parse import Story, parse_stories, synthetic_page
+from hn_records import StoryBatch, StoryRecord
+
+N_STORIES = 100000              # e.g. a long story-store history, or many crawled pages
+story_filter = StoryFilter()
+
+## the stories as the crawl returns them, repeated with distinct ids (fresh strings / ints, as if parsed from many pages):
+page = parse_stories(synthetic_page(3000), backend='stream')
+STORIES = [Story(str(30000000 + i), s.title + ' ', s.href + '?', s.points, s.comments, s.age + ' ')
+           for i, s in enumerate(page[i % len(page)] for i in range(N_STORIES))]
+
+
+def legacy_records(stories):
+    """ hn.py (v19): one dict per story (before the filter; the age still a string) """
+    return [{'title': s.title, 'hn_url': 'https://news.ycombinator.com/item?id=' + s.id, 'ext_link': s.href, 'votes': s.points,
+             'comments': str(s.comments), 'age (h)': s.age} for s in stories]
+
+
+def legacy_filter_sort(stories, story_filter):
+    """ hn.py (v19): filter, dict per kept story, three re.search() per story, itemgetter sort """
+    hn = []
+    for s in stories:
+        if story_filter.reject(s.title, s.href, s.points, s.comments) is None:
+            hn.append({'title': s.title, 'hn_url': 'https://news.ycombinator.com/item?id=' + s.id, 'ext_link': s.href, 'votes': s.points,
+                       'comments': str(s.comments), 'age (h)': s.age})
+    for i in hn:
+        if re.search('minute', i['age (h)']):
+            i['age (h)'] = [int(s) for s in i['age (h)'].split() if s.isdigit()][0] / 60.0
+        elif re.search('hour', i['age (h)']):
+            i['age (h)'] = [int(s) for s in i['age (h)'].split() if s.isdigit()][0]
+        elif re.search('day', i['age (h)']):
+            i['age (h)'] = [int(s) for s in i['age (h)'].split() if s.isdigit()][0] * 24.0
+    return sorted(hn, key=itemgetter('age (h)'), reverse=True)
+
+
+def batch_filter_sort(stories, story_filter):
+    batch = StoryBatch.from_stories(stories)
+    kept = [i for i, reason in enumerate(batch.reject(story_filter)) if reason is None]
+    return batch.output(batch.argsort_age(kept))
+
+
+def best_of(fn, repeat=3):
+    """ (best time (s), result) of repeat runs. """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def traced_kb(build):
+    """ Memory (KB) held by build()'s result -- beyond the Story records it was built from. """
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size // 1024
+
+# ----------------------------------------------------------------------------
+## MEMORY:
+## -------
+
+print('{} stories\n'.format(N_STORIES))
+layouts = [
+    ('dicts (hn.py v19)', lambda: legacy_records(STORIES)),
+    ('Story namedtuples', lambda: [Story(*s) for s in STORIES]),
+    ('StoryRecord (__slots__)', lambda: [StoryRecord.from_story(s) for s in STORIES]),
+    ('StoryBatch (columns)', lambda: StoryBatch.from_stories(STORIES)),
+]
+print('{:>26}  {:>10}  {:>12}'.format('layout', 'KB', 'bytes/story'))
+for name, build in layouts:
+    kb = traced_kb(build)
+    print('{:>26}  {:>10,}  {:>12.0f}'.format(name, kb, kb * 1024 / N_STORIES))
+print('\n(the titles / URLs / age texts are shared with the Story records in every layout but the dicts\' hn_url and comments strings)\n')
+
+# ----------------------------------------------------------------------------
+## FILTER + SORT:
+## --------------
+
+## the keyword search costs the same in both, so also without it (thresholds only):
+for rules, rules_filter in [('default rules', story_filter), ('thresholds only', StoryFilter({'exclude_keywords': []}))]:
+    t_legacy, legacy = best_of(lambda: legacy_filter_sort(STORIES, rules_filter))
+    t_batch, columnar = best_of(lambda: batch_filter_sort(STORIES, rules_filter))
+    assert columnar == legacy and [type(r['age (h)']) for r in columnar] == [type(r['age (h)']) for r in legacy]
+    print('{}: {} kept'.format(rules, len(legacy)))
+    print('{:>40}: {:8.1f} ms'.format('dicts, re.search ages, itemgetter sort', t_legacy * 1e3))
+    print('{:>40}: {:8.1f} ms'.format('StoryBatch, column filter, argsort', t_batch * 1e3))
+print()
+
+## the filter step alone: per story (StoryFilter.reject) vs. down the columns (StoryBatch.reject):
+batch = StoryBatch.from_stories(STORIES)
+for rules, rules_filter in [('default rules', story_filter), ('thresholds only', StoryFilter({'exclude_keywords': []}))]:
+    t_stories, per_story = best_of(lambda: [rules_filter.reject(s.title, s.href, s.points, s.comments) for s in STORIES])
+    t_columns, columns = best_of(lambda: batch.reject(rules_filter))
+    assert columns == per_story
+    print('{:>40}: {:8.1f} ms'.format('filter only ({}): per story'.format(rules), t_stories * 1e3))
+    print('{:>40}: {:8.1f} ms'.format('filter only ({}): columns'.format(rules), t_columns * 1e3))
+print()
+
+records = legacy_records(STORIES)
+for r, age in zip(records, batch.ages):
+    r['age (h)'] = age
+t_dicts, _ = best_of(lambda: sorted(records, key=itemgetter('age (h)'), reverse=True))
+t_argsort, _ = best_of(batch.argsort_age)
+print('{:>40}: {:8.1f} ms'.format('sort only: itemgetter over dicts', t_dicts * 1e3))
+print('{:>40}: {:8.1f} ms'.format('sort only: argsort over the ages column', t_argsort * 1e3))
+
+# ============================================================================
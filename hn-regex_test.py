@@ -8,13 +8,14 @@
         title: Hacker News Scraper regex tester
        author: Victoria A. Stuart
       created: 2020-05-05
-      version: 01
+      version: 02
 last modified: 2020-05-05 10:43:09 -0700 (PST)
 
    Notes: I program in Vim with textwidth=220
 
 Versions:
     * v01 : this
+    * v02 : multiple_replace() from hn_output.py (precompiled, cached Translator)
 
 See also:
     * /mnt/Vancouver/programming/python/scripts/hn.py    ## << generates:
@@ -32,7 +33,7 @@ warnings.warn = warn
 warnings.filterwarnings("ignore", category=UserWarning)
 # ============================================================================
 
-import re, sys
+import sys
 
 # Various "in place" regex expressions over JSON output (hn.txt) file.
 
@@ -70,11 +71,8 @@ import re, sys
     ... as implemented, below.
 """
 
-def multiple_replace(dict, text):
-    # Create a regular expression  from the dictionary keys:
-    regex = re.compile("(%s)" % "|".join(map(re.escape, dict.keys())))
-    # For each match, look-up corresponding value in dictionary:
-    return regex.sub(lambda mo: dict[mo.string[mo.start():mo.end()]], text)
+## multiple_replace(dict, text): the regex is compiled once per replacement dict (hn_output.Translator):
+from hn_output import multiple_replace
 
 """ Use a dictionary to replace various annoyances in the "hn.txt" file generated by my "hn.py" script:
 
@@ -0,0 +1,166 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-replay_bench.py
+        about: offline end-to-end benchmark: the whole hn.py pipeline (fetch --> parse --> filter --> sort --> write + postprocess) replayed from hn.*.txt snapshots
+        title: Hacker News Scraper replay benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 05
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : front pages rebuilt from hn.2020.05.03.raw.txt (hn_standin.snapshot_page); output checked against hn.2020.05.03.postprocessed.txt;
+            per-stage wall / CPU time, stories/s and peak memory (tracemalloc) at 1x ... 300x the snapshot
+    * v02 : change detection (hn.py v22): full run vs. unchanged front page vs. scores-only change (patched output)
+    * v03 : scores-only change is a full write (hn.py v25: the "New since last run" banner moves every run); the path taken is printed
+    * v04 : the output path each run takes (write | patch | none), checked (hn.py v27); the patched file checked against a full write; ages move too
+    * v05 : the traced 'crawl' peak checked to cover its 'fetch' / 'parse' stages (hn_metrics.py v03)
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py            ## << run()
+    * /mnt/Vancouver/programming/python/scripts/hn_standin.py    ## << ReplaySession, snapshot_page()
+    * /mnt/Vancouver/programming/python/scripts/hn_output.py     ## << read_snapshot()
+    * /mnt/Vancouver/programming/python/scripts/hn_metrics.py
+
+No network, no HTTP server: hn.run() fetches through a hn_standin.ReplaySession (in-process; pages from the snapshot records), with a
+fresh in-memory story store and no response cache, so every run does the full work.  The golden files are hand-edited (a "SNIP"
+marker, section banners), so the check compares the story records -- and, separately, the postprocessing of the raw file.
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-replay_bench.py
+==============================================================================
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import hn
+from hn_metrics import RunMetrics
+from hn_output import read_snapshot
+from hn_standin import ReplaySession, snapshot_page
+from hn_store import StoryStore
+
+SCALES = [1, 10, 100, 300]           # copies of the snapshot's stories on the (one) replayed page
+STAGES = ['fetch', 'parse', 'crawl', 'store', 'filter', 'sort', 'write']
+ID_STEP = 10**6                      # item id offset between copies
+
+here = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(here, 'hn.2020.05.03.raw.txt'), 'r') as f:
+    raw = f.read()
+with open(os.path.join(here, 'hn.2020.05.03.postprocessed.txt'), 'r') as f:
+    postprocessed = f.read()
+records = read_snapshot(raw)
+
+
+def replay(copies, output_path, output_format='text', trace=False):
+    """ One hn.run() over a page of `copies` x the snapshot's stories; returns (RunMetrics, stories kept). """
+    page = ''.join(snapshot_page(records, id_offset=i * ID_STEP) for i in range(copies)) if copies > 1 else snapshot_page(records)
+    hn.output_path = output_path
+    hn.output_format = output_format
+    session = ReplaySession({'news': page}, base_url=hn.hn_site_url)
+    store = StoryStore(':memory:')
+    metrics = RunMetrics()
+    if trace:
+        tracemalloc.start()
+    try:
+        _, _, hn_list_sorted = hn.run(session, None, store, metrics=metrics, quiet=True)
+    finally:
+        if trace:
+            tracemalloc.stop()
+        store.close()
+    return metrics, len(hn_list_sorted)
+
+
+# ----------------------------------------------------------------------------
+## GOLDEN FILES:
+## -------------
+
+hn.crawl_endpoints, hn.crawl_pages = ['news'], 1
+assert hn.hn_translator(raw) == postprocessed, 'postprocessing of hn.2020.05.03.raw.txt != hn.2020.05.03.postprocessed.txt'
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'hn.txt')
+    replay(1, path)
+    with open(path, 'r') as f:
+        output = f.read()
+key = lambda r: r['hn_url']
+assert sorted(read_snapshot(output), key=key) == sorted(read_snapshot(postprocessed), key=key), 'replayed records != golden records'
+print('golden files: {} records match; postprocessing matches\n'.format(len(records)))
+
+# ----------------------------------------------------------------------------
+## PER-STAGE THROUGHPUT:
+## ---------------------
+
+print('{:>8}  {:>7}  {:>8}  {:>10}  {:>10}  {:>12}  {:>9}'.format('stories', 'kept', 'stage', 'wall (ms)', 'cpu (ms)', 'stories/s', 'peak (KB)'))
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'hn.txt')
+    for copies in SCALES:
+        n = copies * len(records)
+        ## timings from an untraced run (tracemalloc slows allocation-heavy stages down); peaks from a traced one:
+        metrics, kept = replay(copies, path)
+        traced, _ = replay(copies, path, trace=True)
+        for name in STAGES:
+            s = metrics.stages.get(name)
+            if s is None:
+                continue
+            print('{:>8}  {:>7}  {:>8}  {:>10.2f}  {:>10.2f}  {:>12,.0f}  {:>9}'.format(
+                n, kept, name, s['wall_s'] * 1e3, s['cpu_s'] * 1e3, n / s['wall_s'] if s['wall_s'] else float('inf'),
+                traced.stages[name].get('peak_kb', '-')))
+        ## a one-page crawl runs 'fetch' / 'parse' on the main thread, inside 'crawl': its peak covers theirs
+        peaks = {name: s['peak_kb'] for name, s in traced.stages.items() if 'peak_kb' in s}
+        assert peaks['crawl'] >= max(peaks.get('fetch', 0), peaks.get('parse', 0)), peaks
+        print()
+
+    ## postprocessing cost inside the 'write' stage: 'text' (through the Translator) vs. 'jsonl' (no substitutions):
+    copies = SCALES[-1]
+    for output_format in ['text', 'jsonl']:
+        t0 = time.perf_counter()
+        metrics, _ = replay(copies, path, output_format=output_format)
+        print('{:>6} x snapshot, output_format {!r:>7}: write {:8.2f} ms; whole run {:8.2f} ms'.format(
+            copies, output_format, metrics.stages['write']['wall_s'] * 1e3, (time.perf_counter() - t0) * 1e3))
+
+# ----------------------------------------------------------------------------
+## CHANGE DETECTION:
+## -----------------
+
+print()
+with tempfile.TemporaryDirectory() as tmp:
+    copies = SCALES[-1]
+    hn.output_path, hn.output_format = os.path.join(tmp, 'hn.txt'), 'text'
+    store = StoryStore(':memory:')
+    pages = {'news': ''.join(snapshot_page(records, id_offset=i * ID_STEP) for i in range(copies))}
+    session = ReplaySession(pages, base_url=hn.hn_site_url)
+    ## votes + 1 on every third story, ages + 1 h: a run later, the same stories -- no new ones, so the sections stay as they are
+    bumped = [dict(r, votes=r['votes'] + (i % 3 == 0), **({'age (h)': r['age (h)'] + 1} if isinstance(r['age (h)'], int) else {}))
+              for i, r in enumerate(records)]
+    runs = [('full run', None, 'write'),
+            ('front page unchanged', None, 'none'),
+            ('scores changed (patch)', ''.join(snapshot_page(bumped, id_offset=i * ID_STEP) for i in range(copies)), 'patch')]
+    for label, page, expect in runs:
+        if page is not None:
+            pages['news'] = page
+        metrics = RunMetrics()
+        t0 = time.perf_counter()
+        result = hn.run(session, None, store, metrics=metrics, quiet=True)
+        path_taken = 'patch' if 'patch' in metrics.stages else 'write' if 'write' in metrics.stages else 'none'
+        print('{:>6} x snapshot, {:>24}: {:8.2f} ms  output: {:>5}  (stages: {})'.format(copies, label, (time.perf_counter() - t0) * 1e3, path_taken,
+                                                                                     ', '.join(metrics.stages)))
+        assert path_taken == expect, (label, path_taken)
+    ## the patched file is the file a full write (same sections and banner) makes:
+    with open(hn.output_path) as f:
+        patched = f.read()
+    fingerprints = store.fingerprints()
+    hn.write_results(result[2], set(fingerprints['new ids'].split()), fingerprints['banner'])
+    with open(hn.output_path) as f:
+        assert f.read() == patched
+    print('{:>6} x snapshot, {:>24}: {} records; same as a full write'.format(copies, 'patched', metrics.counters['records_patched']))
+    store.close()
+
+# ============================================================================
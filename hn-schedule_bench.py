@@ -0,0 +1,136 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-schedule_bench.py
+        about: hn_schedule.FetchScheduler against the fault-injecting stand-in: retries, Retry-After, timeouts, deadlines, circuit breaker, rate limit
+        title: Hacker News Scraper fetch scheduler benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 01
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : one scenario per fault (hn_standin.py faults), each checked (outcome, requests made, elapsed time); hn.run() on a degraded
+            site keeps the last hn.txt; token-bucket pacing of a 20-page crawl
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_schedule.py
+    * /mnt/Vancouver/programming/python/scripts/hn_standin.py
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-schedule_bench.py
+==============================================================================
+"""
+
+import os
+import tempfile
+import time
+import hn
+import hn_standin
+from hn_fetch import FetchError, crawl, make_session
+from hn_metrics import RunMetrics
+from hn_schedule import CircuitOpen, FetchScheduler
+from hn_store import StoryStore
+
+## short settings, so the scenarios take seconds:
+FAST = dict(rate=100.0, burst=10, timeout=(1, 0.5), deadline=5.0, retries=3, backoff=0.05, max_backoff=0.5, failures=5, reset=1.0)
+
+server, base_url = hn_standin.start(hang=3)
+session = make_session(pool_size=4)
+
+
+def scenario(label, faults, scheduler, expect, max_requests, min_s=0.0, max_s=None):
+    """ Fetch base_url + 'news' with faults queued; check the outcome ('ok' or an exception class), requests made and time taken. """
+    server.faults.clear()
+    server.inject(faults)
+    hits = sum(server.hits.values())
+    metrics = RunMetrics()
+    t0 = time.perf_counter()
+    try:
+        res = scheduler.get(session, base_url + 'news', metrics=metrics)
+        outcome = 'ok' if res.status_code == 200 else 'HTTP {}'.format(res.status_code)
+    except FetchError as e:
+        outcome, error = type(e), e
+    elapsed = time.perf_counter() - t0
+    requests = sum(server.hits.values()) - hits
+    print('{:>34}: {:>11}  {} request(s)  {:6.2f} s  {}'.format(label, outcome if isinstance(outcome, str) else outcome.__name__, requests, elapsed,
+                                                            dict(metrics.counters)))
+    assert outcome == expect, (label, outcome)
+    assert requests <= max_requests, (label, requests)
+    assert min_s <= elapsed and (max_s is None or elapsed <= max_s), (label, elapsed)
+    return outcome
+
+# ----------------------------------------------------------------------------
+## FAULTS:
+## -------
+
+print('faults --> FetchScheduler.get()\n')
+scenario('no fault', [], FetchScheduler(**FAST), 'ok', 1)
+scenario('503, 503 (backoff, retry)', ['503', '503'], FetchScheduler(**FAST), 'ok', 3)
+scenario('503 + Retry-After: 1', ['503:1'], FetchScheduler(**FAST), 'ok', 2, min_s=0.95)
+scenario('429 + Retry-After: 30 (> deadline)', ['429:30'], FetchScheduler(**FAST), FetchError, 1, max_s=1.0)
+scenario('hang (read timeout, retry)', ['hang'], FetchScheduler(**FAST), 'ok', 2, min_s=0.45, max_s=2.0)
+scenario('connection reset (retry)', ['reset'], FetchScheduler(**FAST), 'ok', 2)
+scenario('500 x 4 (retries used up)', ['500'] * 4, FetchScheduler(**FAST), FetchError, 4)
+scenario('hang x 20 (5 s deadline)', ['hang'] * 20, FetchScheduler(**dict(FAST, retries=20, failures=50)), FetchError, 11, max_s=5.5)
+
+## the breaker: failures=3 (fewer than the retries) opens it within one request; then no requests until `reset` s have passed
+scheduler = FetchScheduler(**dict(FAST, failures=3))
+scenario('503 x 3: breaker opens', ['503'] * 3, scheduler, CircuitOpen, 3)
+scenario('breaker open: no request', [], scheduler, CircuitOpen, 0)
+time.sleep(scheduler.reset)
+scenario('half-open trial fails: open again', ['503'], scheduler, CircuitOpen, 1)
+scenario('still open', [], scheduler, CircuitOpen, 0)
+time.sleep(scheduler.reset)
+scenario('half-open trial succeeds: closed', [], scheduler, 'ok', 1)
+scenario('closed', [], scheduler, 'ok', 1)
+
+# ----------------------------------------------------------------------------
+## DEGRADED SITE --> hn.txt KEPT:
+## ------------------------------
+
+print('\nhn.run() on a degraded site\n')
+with tempfile.TemporaryDirectory() as tmp:
+    hn.hn_site_url, hn.crawl_endpoints, hn.crawl_pages = base_url, ['news'], 1
+    hn.output_path, hn.output_format = os.path.join(tmp, 'hn.txt'), 'text'
+    hn.thread_comments = False
+    store = StoryStore(':memory:')
+    server.faults.clear()
+    assert hn.run(session, None, store, quiet=True, scheduler=FetchScheduler(**FAST)) is not None
+    with open(hn.output_path, 'rb') as f:
+        good = f.read()
+    for label, faults in [('503 x 4 (was: an empty hn.txt)', ['503'] * 4), ('overload page, 200 (no stories)', ['empty']),
+                          ('hung connections', ['hang'] * 4)]:
+        server.inject(faults)
+        metrics = RunMetrics()
+        t0 = time.perf_counter()
+        result = hn.run(session, None, store, metrics=metrics, quiet=True, scheduler=FetchScheduler(**FAST))
+        with open(hn.output_path, 'rb') as f:
+            kept = f.read() == good
+        print('{:>34}: result {}, hn.txt kept: {}  {:6.2f} s  {}'.format(label, result, kept, time.perf_counter() - t0, dict(metrics.counters)))
+        assert result is None and kept and metrics.counters['run_degraded'] == 1
+        server.faults.clear()
+    store.close()
+
+# ----------------------------------------------------------------------------
+## RATE LIMIT:
+## -----------
+
+print('\ntoken bucket: 20-page crawl (4 endpoints x 5 pages), 8 workers\n')
+for rate, burst in [(None, None), (20.0, 4), (5.0, 4)]:
+    scheduler = FetchScheduler(**dict(FAST, rate=rate, burst=burst)) if rate else None
+    t0 = time.perf_counter()
+    stories = crawl(session, endpoints=['news', 'newest', 'ask', 'show'], pages=5, base_url=base_url, backend='stream', per_host=8, scheduler=scheduler)
+    elapsed = time.perf_counter() - t0
+    ## 20 requests: the burst at once, the rest at `rate` per second
+    floor = (20 - burst) / rate if rate else 0.0
+    print('{:>34}: {:6.2f} s  (>= {:.2f} s)  {} stories'.format('no scheduler' if rate is None else '{:g} / s, burst {}'.format(rate, burst), elapsed, floor, len(stories)))
+    assert elapsed >= floor * 0.95
+
+server.shutdown()
+
+# ============================================================================
@@ -0,0 +1,100 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-startup_bench.py
+        about: benchmark: start-up of hn.py show (lazy imports) vs. importing everything up front (hn.py v23); python -X importtime
+        title: Hacker News Scraper start-up benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 02
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : wall time per command line (median of RUNS fresh interpreters); 'import hn' cumulative import time (-X importtime), with the
+            slowest imports; the heavy modules must not be loaded by hn.py show
+    * v02 : tracemalloc among the modules hn.py show must not load
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py    ## << main(): fetch | show | watch | analyze
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-startup_bench.py
+==============================================================================
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 15
+here = os.path.dirname(os.path.abspath(__file__))
+snapshot = os.path.join(here, 'hn.2020.05.03.raw.txt')
+HEAVY = ['requests', 'urllib3', 'bs4', 'lxml', 'sqlite3', 'concurrent.futures', 'hn_fetch', 'hn_comments', 'hn_store', 'hn_parse', 'tracemalloc']
+## what 'import hn' loaded up front before v24:
+EAGER = 'import hn, hn_comments, hn_fetch, hn_records, hn_schedule, hn_store, cProfile, pstats, signal, subprocess, threading'
+
+commands = [
+    ('python (no script)', [sys.executable, '-c', 'pass']),
+    ('hn.py show', [sys.executable, os.path.join(here, 'hn.py'), 'show', snapshot]),
+    ('hn.py show, eager imports (v23)', [sys.executable, '-c', EAGER + '; hn.main(["show", {!r}])'.format(snapshot)]),
+    ('hn.py fetch --help', [sys.executable, os.path.join(here, 'hn.py'), 'fetch', '--help']),
+]
+
+
+def wall_ms(args):
+    times = []
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        subprocess.run(args, cwd=here, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - t0) * 1e3)
+    return statistics.median(times)
+
+
+def import_times(code):
+    """ {module: (self us, cumulative us)} from python -X importtime -c code (not counting the interpreter's own start-up: site). """
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=here, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                         universal_newlines=True, check=True).stderr
+    times = {}
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if name.strip() == 'site':
+            times = {}
+            continue
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+# ----------------------------------------------------------------------------
+## WALL TIME:
+## ----------
+
+print('{:>34}  {:>10}   (median of {} runs)'.format('command', 'wall (ms)', RUNS))
+for label, args in commands:
+    print('{:>34}  {:10.1f}'.format(label, wall_ms(args)))
+
+# ----------------------------------------------------------------------------
+## IMPORT TIME:
+## ------------
+
+print()
+for label, code in [('import hn', 'import hn'), ('eager imports (v23)', EAGER)]:
+    times = import_times(code)
+    ## the modules the code imports, with everything they import; the slowest of those:
+    top = code.replace(',', ' ').split()[1:]
+    total = sum(cumulative for name, (_, cumulative) in times.items() if name in top)
+    slowest = sorted(((cumulative, name) for name, (_, cumulative) in times.items() if name not in top), reverse=True)[:5]
+    print('{:>34}  {:8.1f} ms   slowest: {}'.format(label, total / 1e3, ', '.join('{} {:.1f}'.format(name, us / 1e3) for us, name in slowest)))
+
+loaded = subprocess.run([sys.executable, '-c', 'import sys, hn; hn.main(["show", {!r}]); print(" ".join(m for m in {!r} if m in sys.modules), file=sys.stderr)'.format(
+    snapshot, HEAVY)], cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr.split()
+print('\nheavy modules loaded by hn.py show: {}'.format(', '.join(loaded) or 'none'))
+assert not loaded, loaded
+
+# ============================================================================
@@ -0,0 +1,141 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn-subtext_bench.py
+        about: fuzz check + benchmark: hn_parse.parse_subtext() (one precompiled pass) vs. the per-field regexes of hn.py (v07) and hn_parse.py (v02)
+        title: Hacker News Scraper subtext tokenizer benchmark
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 01
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : N_SUBTEXTS generated subtext strings (stories, job posts, "discuss", 1 point / 1 comment, minutes .. years, odd user names,
+            &nbsp; / newlines); every field checked against the generator; the older decoders' errors counted; timings
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_parse.py     ## << parse_subtext()
+    * /mnt/Vancouver/programming/python/scripts/hn_records.py   ## << parse_age()
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn-subtext_bench.py [seed]
+==============================================================================
+"""
+
+import random
+import re
+import sys
+import time
+from hn_parse import Subtext, parse_subtext
+
+N_SUBTEXTS = 200000
+seed = int(sys.argv[1]) if len(sys.argv) > 1 else 20201018
+rng = random.Random(seed)
+
+UNITS = ['minute', 'hour', 'day', 'month', 'year']
+USERS = ['pseudolus', 'pcr910303', 'discuss', 'comments', '1337', 'hour_ago', 'x']
+SPACES = [' ', ' ', ' ', '\xa0', '  ', '\n        ']
+
+
+def plural(n, word):
+    return '{} {}'.format(n, word if n == 1 else word + 's')
+
+
+def generate():
+    """ (subtext text as get_text() returns it, the Subtext it holds). """
+    sp = rng.choice(SPACES)
+    n_age, unit = rng.choice([1, rng.randint(2, 59)]), rng.choice(UNITS)
+    age = plural(n_age, unit) + ' ago'
+    kind = rng.random()
+    if kind < 0.05:
+        ## job post: age only
+        return sp + age + sp, Subtext(None, None, n_age, unit)
+    points = rng.choice([1, rng.randint(2, 3000)])
+    if kind < 0.25:
+        comments, comments_text = 0, 'discuss'
+    else:
+        comments = rng.choice([1, rng.randint(2, 2000)])
+        comments_text = plural(comments, 'comment').replace(' ', rng.choice(['\xa0', ' ']))
+    parts = [plural(points, 'point'), 'by', rng.choice(USERS), age, '|', 'flag', '|', 'hide', '|']
+    if rng.random() < 0.1:
+        parts += ['past', '|', 'web', '|']
+    parts.append(comments_text)
+    return sp + sp.join(parts) + sp, Subtext(points, comments, n_age, unit)
+
+# ----------------------------------------------------------------------------
+## OLDER DECODERS:
+## ---------------
+
+def legacy_decode(texts):
+    """ hn.py (v07): re.sub(' point.*') / uncompiled re.search() per field, except: pass (a failure keeps the previous story's value). """
+    out = []
+    points = comments = age = unit = None
+    for text in texts:
+        try:
+            points = int(re.sub(r' point.*', '', text.split(' by ')[0]).strip())
+        except Exception:
+            pass
+        try:
+            comments = int(re.search(r'hide \| (.+?)\scomment.*$', ' '.join(text.split())).group(1))
+        except Exception:
+            pass
+        for u in ('minute', 'hour', 'day'):
+            if re.search(u, text):
+                try:
+                    age, unit = [int(s) for s in text.split() if s.isdigit()][1 if points is not None else 0], u
+                except Exception:
+                    pass
+                break
+        out.append(Subtext(points, comments, age, unit))
+    return out
+
+
+POINTS_RE = re.compile(r'(\d+)\s+point')
+COMMENTS_RE = re.compile(r'hide \| (.+?)\scomment')
+AGE_RE = re.compile(r'(\d+)\s+(minute|hour|day)')
+
+
+def v02_decode(texts):
+    """ hn_parse.py (v02) / hn_records.py (v01): three precompiled searches; "discuss", months and years --> None. """
+    out = []
+    for text in texts:
+        m = POINTS_RE.search(text)
+        points = int(m.group(1)) if m else None
+        m = COMMENTS_RE.search(text)
+        comments = int(m.group(1)) if m and m.group(1).isdigit() else None
+        m = AGE_RE.search(text)
+        out.append(Subtext(points, comments, int(m.group(1)) if m else None, m.group(2) if m else None))
+    return out
+
+
+def tokenizer_decode(texts):
+    return [parse_subtext(text) for text in texts]
+
+# ----------------------------------------------------------------------------
+## FUZZ CHECK + TIMINGS:
+## ---------------------
+
+cases = [generate() for _ in range(N_SUBTEXTS)]
+texts = [text for text, _ in cases]
+truth = [fields for _, fields in cases]
+print('{} generated subtext strings (seed {})\n'.format(N_SUBTEXTS, seed))
+
+print('{:>36}  {:>9}  {:>9}  {:>9}  {:>9}  {:>9}'.format('decoder', 'ms', 'points', 'comments', 'age', 'all ok'))
+for name, decode in [('hn.py v07 (re.sub / re.search)', legacy_decode), ('hn_parse v02 (3 regexes)', v02_decode),
+                     ('parse_subtext (1 pass)', tokenizer_decode)]:
+    t0 = time.perf_counter()
+    decoded = decode(texts)
+    ms = (time.perf_counter() - t0) * 1e3
+    wrong = [sum(getattr(d, field) != getattr(t, field) for d, t in zip(decoded, truth)) for field in ('points', 'comments', 'age')]
+    ok = sum(d == t for d, t in zip(decoded, truth))
+    print('{:>36}  {:9.1f}  {:>9}  {:>9}  {:>9}  {:>9}'.format(name, ms, *['{} bad'.format(n) for n in wrong], '{:.2%}'.format(ok / N_SUBTEXTS)))
+    if decode is tokenizer_decode:
+        bad = [(text, d, t) for text, d, t in zip(texts, decoded, truth) if d != t]
+        assert not bad, bad[:5]
+print('\nparse_subtext(): every field of every string as generated')
+
+# ============================================================================
@@ -9,7 +9,7 @@
        author: Victoria A. Stuart
      based on: https://github.com/RBrache21/HackerNewsScrapper
       created: 2020-04-09
-      version: 07
+      version: 28
 last modified: 2020-05-05 10:46:31 -0700 (PST)
 
    Notes: I program in Vim with textwidth=220
@@ -22,6 +22,27 @@ Versions:
     * v05 : edited (cleaned) script
     * v06 : minor edits: replaced brittle results older that code with simple "if float(item['age (h)']) < 12:"; ...
     * v07 : run 2x daily --> once/day (6 am); added (method; regex expressions dict) to process output text
+    * v08 : single-pass story extraction (hn_parse.py); no more per-item soup.select('td.subtext') rescans
+    * v09 : selectable HTML parser backend (parser_backend: 'html.parser' | 'lxml' | 'stream')
+    * v10 : concurrent multi-page crawl (hn_fetch.py: crawl_endpoints x crawl_pages), deduped by item id
+    * v11 : on-disk response cache (cache_dir; TTL, conditional GET, LRU size cap; optionally the parsed stories)
+    * v12 : story store (hn_store.py; SQLite) replaces /tmp/old_date and the "age < 24 h" split: new vs. seen since last run; score changes
+    * v13 : keep / drop rules moved to hn_filter.json (hn_filter.py: compiled keyword / domain / regex filter) from the hand-edited if
+    * v14 : postprocessing (hn_dict) while hn.txt is written (hn_output.py: cached, precompiled Translator); no read-back / rewrite pass
+    * v15 : output writers (output_format: text | jsonl | csv | html), atomic replace of output_path; no more sys.stdout redirection
+    * v16 : --watch : long-running mode (one warm session), adaptive polling with jitter / backoff; notify_command on new stories
+    * v17 : per-run metrics (hn_metrics.py: stage timings, counters, drop reasons) appended to metrics_path; --profile, --tracemalloc
+    * v18 : importable: run() / main(); the module-level settings can be overridden before run() (e.g. hn-replay_bench.py)
+    * v19 : opt-in comment threads (thread_comments or --comments; hn_comments.py): true comment counts and top comments per kept story
+    * v20 : stories as a columnar StoryBatch (hn_records.py): ages parsed once; column-wise thresholds, argsort by age; no dicts until output
+    * v21 : hn.py analyze DIR : history of saved snapshots (hn_analyze.py: process pool ingest, incremental index; domains, velocity, trends)
+    * v22 : change detection (page / kept-story fingerprints): unchanged front page --> stop after the fetch; only scores changed --> patch them
+    * v23 : fetch scheduler (hn_schedule.py): rate limit, timeouts / deadlines, retries with backoff; a degraded site keeps the last hn.txt
+    * v24 : commands: hn.py fetch (default) | show | watch | analyze; network / parser / SQLite modules imported only where used (fast 'show')
+    * v25 : change detection: the kept-story fingerprint covers the sections (new / old) and the banner; a patch or a skipped write kept a stale split
+    * v26 : fetch_burst = 20 (was 4: the rate limit stretched the documented 20-page crawl to >= 16 s); crawl_per_host workers (was 8 at most)
+    * v27 : a run with no new (kept) stories keeps the written sections and banner, so a scores-only change is patched (votes, comments, ages)
+    * v28 : parser_backend 'lxml' if installed, else 'stream' (was 'html.parser'); crawl_per_host = 20: the 20-page crawl in ~1.3 x one page (lxml)
 
 See also:
     * https://edavis.github.io/hnrss/
@@ -37,7 +58,7 @@ Usage: via crontab and/or ~/.bashrc alias.  Recommendation: 2x daily via crontab
         # ============================================================================
         # m    h    dom    mon    dow    user    nice    command
         # "At 6 and 18 daily." [http://crontab.guru/]:
-        0    6,18    *    *    *    victoria    nice -n 19    /home/victoria/venv/py3.7/bin/python /mnt/Vancouver/programming/python/scripts/hn.py
+        0    6,18    *    *    *    victoria    nice -n 19    /home/victoria/venv/py3.7/bin/python /mnt/Vancouver/programming/python/scripts/hn.py fetch
         0    6,18    *    *    *    victoria    nice -n 19    notify-send -i "/mnt/Vancouver/programming/python/scripts/hacker_news.png" -t 0 "New Hacker News feeds at" "<span color='#57dafd' font='16px'><a href=\"file:///mnt/Vancouver/programming/python/scripts/output/\">/mnt/Vancouver/programming/python/scripts/output/</a></span>"
 
         The last line above, reformatted here for readability but one line in crontab, is:
@@ -49,9 +70,31 @@ Usage: via crontab and/or ~/.bashrc alias.  Recommendation: 2x daily via crontab
     # ----------------------------------------------------------------------------
     * BASHRC (~/.bashrc [p37 venv]):
 
-        alias hn='/home/victoria/venv/py3.7/bin/python /mnt/Vancouver/programming/python/scripts/hn.py; sleep 5; cat /mnt/Vancouver/programming/python/scripts/output/hn.txt'
+        alias hn='/home/victoria/venv/py3.7/bin/python /mnt/Vancouver/programming/python/scripts/hn.py fetch --show'
 
-        alias hncat='cat /mnt/Vancouver/programming/python/scripts/output/hn.txt'
+        alias hncat='/home/victoria/venv/py3.7/bin/python /mnt/Vancouver/programming/python/scripts/hn.py show'
+
+        'fetch' writes hn.txt before it returns (no 'sleep 5' needed); --show then prints it.  'show' only prints the last results
+        (output_path): it does not fetch, and does not import requests, bs4 or sqlite3 -- see hn-startup_bench.py.  'hn.py' alone is
+        'hn.py fetch'.
+
+    # ----------------------------------------------------------------------------
+    * WATCH MODE (instead of the two crontab lines above):
+
+        /home/victoria/venv/py3.7/bin/python /mnt/Vancouver/programming/python/scripts/hn.py watch
+
+        One long-running process (one warm session / connection pool, parser, filter): polls every watch_interval s, more often while
+        the front page is changing and less often while it is not (watch_min_interval ... watch_max_interval; +/- watch_jitter), backing
+        off exponentially on errors.  hn.txt is rewritten -- and notify_command run (the notify-send line above) -- only when a poll
+        finds new stories; those are the "New since last run" section.  Start it e.g. from a systemd user unit or ~/.xprofile.
+
+    # ----------------------------------------------------------------------------
+    * HISTORY (the saved / mailed hn.txt snapshots, e.g. hn.2020.05.03.raw.txt; see hn_analyze.py):
+
+        /home/victoria/venv/py3.7/bin/python /mnt/Vancouver/programming/python/scripts/hn.py analyze ~/mail/hn/ --keyword rust --keyword covid
+
+        Top domains, score velocity and keyword trends (per month) over every snapshot under the directory; the index (history_index)
+        is kept between runs, so only new snapshots are read.
 ==============================================================================
 """
 # https://stackoverflow.com/questions/879173/how-to-ignore-deprecation-warnings-in-python
@@ -95,178 +138,134 @@ warnings.filterwarnings("ignore", category=UserWarning)
 ## INITIALIZATIONS:
 ## ----------------
 
+import argparse
+import hashlib
+import importlib.util
 import json
-import re
-import requests
-from bs4 import BeautifulSoup
-from operator import itemgetter
-
-res = requests.get('https://news.ycombinator.com/news')
-soup = BeautifulSoup(res.text, 'html.parser')
-# print(soup)
-
-athing = soup.select('.athing')
-links = soup.select('.storylink')
-subtext = soup.select('.subtext')
-
-exclusions = ['dead', 'flagged', 'youtube', 'wikipedia']
-
-# ----------------------------------------------------------------------------
-## DATE, TIME:
-## -----------
-
-import datetime
+import os
+import random
+import sys
 from datetime import datetime
-now = datetime.now()
-
-## Get old_datetime:
-try:
-    with open('/tmp/old_date', 'r') as f:
-        old_datetime_str = f.readline()
-        ## Convert saved datetime string object back to datetime:
-        old_datetime = datetime.strptime(old_datetime_str, '%Y-%m-%d %H:%M:%S')
-except FileNotFoundError:
-    old_datetime = now
-
-## Save current datetime as old_datetime:
-with open('/tmp/old_date', 'w') as f:
-    ## writes datetime object to file as a str:
-    f.write(now.strftime('%Y-%m-%d %H:%M:%S'))
-
-
-def create_custom_hn(links, subtext):
-    hn = []
-    hn_base_url = 'https://news.ycombinator.com/item?id='
+from hn_filter import StoryFilter
+from hn_metrics import NULL_METRICS, RunMetrics
+from hn_output import PATCH_FORMATS, Translator, open_output, patch_scores
+## The fetching / parsing / storing modules (requests, bs4, sqlite3, ...) are imported in the functions that use them, so that
+## 'hn.py show' (and 'import hn') start without them.
+
+## HTML parser backend (hn_parse.py): 'html.parser' (BeautifulSoup) | 'lxml' (fastest; needs lxml) | 'stream' (no parse tree, no
+## dependency; ~3 x faster than 'html.parser').  All three return the same stories; lxml is looked up here, not imported.
+parser_backend = 'lxml' if importlib.util.find_spec('lxml') else 'stream'
+
+## Crawl (hn_fetch.py): pages per listing endpoint {news | newest | best | ask | show}; fetched concurrently over one keep-alive session.
+## e.g. crawl_endpoints = ['news', 'newest', 'best', 'ask', 'show']; crawl_pages = 4  ## 20 pages
+## Pages in flight at once: crawl_per_host (a one-page crawl opens one connection).  With 20, those 20 pages go out together: one
+## round-trip, then the parsing -- which holds the GIL, so the pages are parsed one after another.  hn-crawl_bench.py ("shipped
+## settings"), 20 pages vs. one page:  'lxml' ~1.3 x;  'stream' ~2 x;  'html.parser' ~5 x.  So the 20-page crawl takes about one
+## page's time only with lxml installed; without it ('stream') it takes about two.  crawl_per_host = 4 (hn.py v26) took ~5 round-trips.
+## fetch_burst (below) must be at least the number of pages, or the rate limit -- not the network -- sets the pace: fetch_burst = 4
+## made them take >= 16 s.
+hn_site_url = 'https://news.ycombinator.com/'
+crawl_endpoints = ['news']
+crawl_pages = 1
+crawl_per_host = 20
+
+## Fetch scheduler (hn_schedule.py) for the listing pages: at most fetch_rate requests per second, after a burst of fetch_burst (one
+## run's crawl goes out at once; retries, and the next run if it comes within fetch_burst / fetch_rate s, are paced); each attempt
+## times out after fetch_timeout (connect, read) s, and a page is given up after fetch_deadline s.  Failed attempts (no answer, 429,
+## 5xx) are retried up to fetch_retries times, after an exponential backoff with jitter (fetch_backoff, 2 x, 4 x, ... s) or when the
+## Retry-After header says.  After breaker_failures failed attempts in a row, no requests go out for breaker_reset s.  A run whose
+## pages cannot be fetched -- or hold no stories at all (HN's "Sorry, we're not able to serve your requests this quickly.") --
+## leaves output_path (and the story store) as they were.
+fetch_rate = 1.0
+fetch_burst = 20
+fetch_timeout = (5, 20)
+fetch_deadline = 120
+fetch_retries = 3
+fetch_backoff = 2.0
+breaker_failures = 5
+breaker_reset = 10 * 60
+
+## Response cache (hn_fetch.ResponseCache): a run within cache_ttl seconds of the last one (e.g. the 'hn' alias right after cron) re-uses
+## the fetched pages -- and, with cache_stories, the parsed stories -- without a request; older entries are revalidated (conditional GET).
+## cache_dir = None : no cache.
+cache_dir = os.path.expanduser('~/.cache/hn_scraper')
+cache_ttl = 300
+cache_max_bytes = 20 * 2**20
+cache_stories = True
+
+## Comment threads (hn_comments.py; opt-in, or --comments): for each kept story, the true comment count ('thread comments') and the
+## first thread_top_n top-level comments ('top comments'), from the Hacker News API, thread_workers requests at a time.  A thread is
+## fetched again only when the listing's comment count has changed since it was last fetched (the store keeps the results).
+thread_comments = False
+hn_api_url = 'https://hacker-news.firebaseio.com/v0/'
+thread_top_n = 3
+thread_workers = 8
+
+## Keep / drop rules -- points, comments, exclusions (keywords, domains, regex) -- compiled once from hn_filter.json (hn_filter.py):
+filter_config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hn_filter.json')
+story_filter = StoryFilter.from_file(filter_config)
+
+## Every scraped story is upserted into the story store (hn_store.py: SQLite) with its points / comments; the store (not the
+## story age) decides what is new since the last run, and which stories' points / comments changed.
+store_path = os.path.expanduser('~/.local/share/hn_scraper/hn.sqlite3')
+
+## Output (hn_output.py): output_format 'text' (this layout, postprocessed with hn_dict) | 'jsonl' | 'csv' | 'html' (mail-ready);
+## written to a temporary file, then renamed over output_path (so the hncat alias never sees a half-written file).  output_path '-' : stdout.
+output_path = '/mnt/Vancouver/programming/python/scripts/output/hn.txt'
+output_format = 'text'
+
+## Change detection: the fetched pages and the kept stories are fingerprinted (SHA-1; kept in the story store).  If no page changed
+## since the last run, the run stops after the fetch (no parse, store, filter or write).  A run that finds no new (kept) stories keeps
+## the sections and the "New since last run" banner output_path was written with (as watch mode does); if the same kept stories then
+## come out in the same order and sections, and only their votes / comments / ages moved, just those values are patched into
+## output_path ('text' and 'jsonl'; no full write, no hn_dict pass over the file); if nothing changed, nothing is written.
+## Any change of settings (filter rules, output, crawl, ...), or a missing output file, makes the next run a full one.
+change_detection = True
+
+## Metrics (hn_metrics.py): one JSON line per run (per poll in watch mode) -- stage wall / CPU times, bytes fetched, stories parsed /
+## kept / dropped (and why) -- appended to metrics_path.  metrics_path = None : off; '-' : print it.
+metrics_path = os.path.expanduser('~/.local/share/hn_scraper/metrics.jsonl')
+
+## History index (hn.py analyze; hn_analyze.py): one compact entry per story seen in the saved snapshots; '' : not kept
+history_index = os.path.expanduser('~/.local/share/hn_scraper/history.json')
+
+## Watch mode (hn.py watch; see Usage, above); intervals in seconds:
+watch_interval = 30 * 60
+watch_min_interval = 5 * 60
+watch_max_interval = 3 * 60 * 60
+watch_jitter = 0.1
+## Shorten the interval when more than this fraction of the scraped stories is new; lengthen it when none are:
+watch_fast_change = 0.2
+
+## Notification hook (watch mode): command (argument list) run when a poll finds new stories -- {count}, {path}, {dir} are filled in.
+## notify_command = None : no notifications.
+notify_command = ['notify-send', '-i', '/mnt/Vancouver/programming/python/scripts/hacker_news.png', '-t', '0',
+                  'New Hacker News feeds ({count}) at', "<span color='#57dafd' font='16px'><a href=\"file://{dir}/\">{dir}/</a></span>"]
+
+
+def create_custom_hn(stories, metrics=NULL_METRICS):
+    """ The stories as a StoryBatch (hn_records.py: one column per field, numbers parsed once), and the rows that pass the filter. """
     # ----------------------------------------
-    for idx, item in enumerate(links):
-        # ----------------------------------------
-        ## HN ID -- Hacker News item source ('comments') URL:
-        ## -----------------------------------------
-        ## https://stackoverflow.com/questions/51837685/get-the-numbers-within-the-following-html-tag-via-beautifulsoup
-        ## https://stackoverflow.com/questions/24962673/beautiful-soup-getting-tag-id
-        hn_id = athing[idx].get('id')
-        hn_url = hn_base_url + hn_id
-        # print('hn_id:', hn_id)
-        # print('hn_url:', hn_url)
-        # ----------------------------------------
-        ## Title:
-        ## ------
-        title = links[idx].getText()
-        # ----------------------------------------
-        ## TARGET_URL:
-        ## ----
-        href = links[idx].get('href', None)
-        # ----------------------------------------
-        ## Points (votes):
-        ## ---------------
-        vote = subtext[idx].select('.score')
-        try:
-            points = int(re.sub(r' point.*', '', vote[0].getText()))
-        except IndexError:
-            pass
-        # ----------------------------------------
-        ## Comments:
-        ## ---------
-        hn_element = soup.select('td.subtext')
-        hn_element_text = hn_element[idx].get_text()
-        ## 107 points by pcr910303 2 hours ago  | hide | 52 comments 
-        ## https://stackoverflow.com/questions/4666973/how-to-extract-the-substring-between-two-markers
-        try:
-            comments = re.search('hide \| (.+?)\scomment.*$', hn_element_text).group(1)
-        except AttributeError:
-            pass
-        # ----------------------------------------
-        ## Age:
-        ## ----
-        raw_age = subtext[idx].select('.age')
-        age = raw_age[0].getText()
-        #
-        # ============================================================================
-        ## SET MINIMUM {POINTS | COMMENTS} AND EXCLUSIONS HERE:
-        ## ====================================================
-        ## ----------------------------------------------------
-        ## match: check for match only at beginning of string | search: check for match anywhere in string
-        ## Use any of these:
-        # if points > 100:
-        # if int(comments) >= 100:
-        # if (points > 100) and (int(comments) >= 100):
-        ## https://stackoverflow.com/questions/2152898/filtering-a-list-of-strings-based-on-contents
-        if (points > 5) and \
-                (int(comments) > 1) and \
-                (not [w for w in exclusions if w in title.lower()]) and \
-                (not [w for w in exclusions if w in href.lower()]):
-            hn.append({'title': title, 'hn_url': hn_url, 'ext_link': href, 'votes': points, 'comments': comments, 'age (h)': age})
-    for i in hn:
-        ## match: check for match only at beginning of string | search: check for match anywhere in string
-        if re.search('minute', i['age (h)']):
-            s = [int(s) for s in i['age (h)'].split() if s.isdigit()]
-            age = s[0]/60.0
-            i['age (h)'] = age
-        elif re.search('hour', i['age (h)']):
-            s = [int(s) for s in i['age (h)'].split() if s.isdigit()]
-            age = s[0]
-            i['age (h)'] = age
-        elif re.search('day', i['age (h)']):
-            s = [int(s) for s in i['age (h)'].split() if s.isdigit()]
-            age = s[0]*24.0
-            i['age (h)'] = age
+    ## Story records from a single pass over the 'athing' / 'subtext' row pairs (hn_parse.parse_stories):
+    from hn_records import StoryBatch
+    batch = StoryBatch.from_stories(stories)
+    metrics.count('stories_parsed', len(batch))
+    #
+    # ============================================================================
+    ## MINIMUM {POINTS | COMMENTS} AND EXCLUSIONS: SET THEM IN hn_filter.json (see hn_filter.py):
+    ## ==========================================================================================
+    kept = []
+    for i, reason in enumerate(batch.reject(story_filter)):
+        if reason is not None:
+            metrics.drop(reason)
         else:
-            pass
+            kept.append(i)
+    metrics.count('stories_kept', len(kept))
     # ----------------------------------------
     ## Return:
     ## -------
-    # print('hn:\n:', hn)
-    return hn
-
-hn_list = create_custom_hn(links, subtext)
-
-# hn_list_sorted  = sorted(hn_list, key = itemgetter('age (h)'), reverse=True)
-hn_list_sorted  = sorted(hn_list, key = itemgetter('age (h)'), reverse=True)
-# print('\nhn_list_sorted:\n', hn_list_sorted)
-
-print('\nOld date, time:', old_datetime)
-print('           now:', now.strftime('%Y-%m-%d %H:%M:%S'))
-
-## https://stackoverflow.com/questions/24217641/how-to-get-the-difference-between-two-dates-in-hours-minutes-and-seconds
-date_diff = now - old_datetime
-
-## AttributeError: 'datetime.timedelta' object has no attribute 'hours'
-# print('date_diff.seconds:', date_diff.seconds)
-date_diff_hours = date_diff.seconds / 3600
-
-print(' date_diff (h): {:0.4f}'.format(date_diff_hours))
-print()
+    return batch, kept
 
-## https://stackoverflow.com/questions/4110891/how-to-redirect-the-output-of-print-to-a-txt-file
-## Write results to file (redirects all print statements):
-
-import sys
-with open('/mnt/Vancouver/programming/python/scripts/output/hn.txt', 'w') as f:
-    """ mode='a' : append | "w" : overwrite
-    """
-    sys.stdout = f
-
-    i = 0
-    found = False
-    for item in hn_list_sorted:
-        # Since I run this script every 12 h (6 am/pm), regard "new" < 12h:
-        # if float(item['age (h)']) < 12:
-        if float(item['age (h)']) < 24:
-            found = True
-            break
-        else:
-            i += 1
-    if found:
-        for item in range(0, i):
-            print(json.dumps(hn_list_sorted[item], indent=2))
-        print('\n==============================================================================')
-        print('Older results: {}'.format(old_datetime))
-        print('==============================================================================\n')
-        for item in range(i, len(hn_list_sorted)):
-            print(json.dumps(hn_list_sorted[item], indent=2))
-    else:
-        ## All results are 'new,;' so print all of them:
-        print(json.dumps(item, indent=2))
 
 # ============================================================================
 ## POSTPROCESSING
@@ -307,16 +306,12 @@ with open('/mnt/Vancouver/programming/python/scripts/output/hn.txt', 'w') as f:
         2. https://stackoverflow.com/questions/15175142/how-can-i-do-multiple-substitutions-using-regex-in-python
            https://stackoverflow.com/a/15175239/1904943
 
-    ... as implemented, below.
+    ... as implemented, below -- now without the read / rewrite of "hn.txt": the substitutions are made as the file is written
+    (hn_output.TextWriter), with the regex compiled once per replacement dict (hn_output.Translator).
 """
 # ----------------------------------------------------------------------------
 ## https://stackoverflow.com/questions/15175142/how-can-i-do-multiple-substitutions-using-regex-in-python
-
-def multiple_replace(dict, text):
-    # Create a regular expression  from the dictionary keys:
-    regex = re.compile("(%s)" % "|".join(map(re.escape, dict.keys())))
-    # For each match, look-up corresponding value in dictionary:
-    return regex.sub(lambda mo: dict[mo.string[mo.start():mo.end()]], text)
+## multiple_replace(dict, text), as a precompiled, cached Translator (hn_output.py; imported at the top):
 
 """ Use a dict to replace various annoyances in the "hn.txt" file generated by my "hn.py" script:
 
@@ -338,16 +333,394 @@ hn_dict = {
         ,"\\u2013" : "-"
         }
 
-with open('/mnt/Vancouver/programming/python/scripts/output/hn.txt', 'r') as f:
-    new_text = multiple_replace(hn_dict, f.read())
+hn_translator = Translator.for_table(hn_dict)
 
-with open('/mnt/Vancouver/programming/python/scripts/output/hn.txt', 'w') as f:
-    f.write(new_text)
+# ============================================================================
+## SCRAPE, REPORT, WRITE:
+
+def add_threads(hn_list, stories, session, store, now, metrics=NULL_METRICS):
+    """ Add 'thread comments' / 'top comments' to the records: fetched for new threads and changed comment counts, else from the store. """
+    listed = {int(story.id): story.comments for story in stories}
+    ids = [int(item['hn_url'].rsplit('=', 1)[1]) for item in hn_list]
+    known = store.lookup_threads(ids)
+    stale = [hn_id for hn_id in ids if hn_id not in known or known[hn_id][0] != listed[hn_id]]
+    metrics.count('threads_skipped', len(ids) - len(stale))
+    metrics.count('threads_fetched', len(stale))
+    from hn_comments import fetch_threads
+    threads = fetch_threads(session, stale, api_url=hn_api_url, top_n=thread_top_n, workers=thread_workers, metrics=metrics)
+    store.save_threads([(hn_id, listed[hn_id], thread.count, thread.top) for hn_id, thread in threads.items()], now=now.timestamp())
+    for item, hn_id in zip(hn_list, ids):
+        if hn_id in threads:
+            item['thread comments'], item['top comments'] = threads[hn_id].count, threads[hn_id].top
+        elif hn_id in known:
+            ## unchanged -- or could not be fetched this time: the last results
+            item['thread comments'], item['top comments'] = known[hn_id][1], known[hn_id][2]
+        else:
+            item['thread comments'], item['top comments'] = None, []
+
+
+def scrape(session, cache, store, now, metrics=NULL_METRICS, digests=None, scheduler=None):
+    """ One pass: crawl --> story store --> filter --> sort (--> comment threads).  Returns (stories, run_diff, hn_list_sorted).
+
+        digests: the page digests of the last run ({url: digest}; updated): None is returned if no page changed.
+        FetchError (before the story store is touched) if the pages could not be fetched, or held no stories.
+    """
+    from hn_fetch import FetchError, crawl
+    ## Story records, deduped by HN item id across pages / endpoints:
+    with metrics.stage('crawl'):
+        stories = crawl(session, endpoints=crawl_endpoints, pages=crawl_pages, base_url=hn_site_url, backend=parser_backend,
+                        workers=crawl_per_host, per_host=crawl_per_host, cache=cache, metrics=metrics, digests=digests, scheduler=scheduler)
+    if stories is None:
+        return None
+    if not stories:
+        ## e.g. an overload page served with a 200: not an empty front page
+        raise FetchError('no stories in the fetched pages ({})'.format(', '.join(crawl_endpoints)))
+    # print(stories)
+    with metrics.stage('store'):
+        run_diff = store.record_run(stories, now=now.timestamp())
+    metrics.count('stories_new', len(run_diff.new))
+    metrics.count('stories_changed', len(run_diff.changed))
+    with metrics.stage('filter'):
+        batch, kept = create_custom_hn(stories, metrics)
+    with metrics.stage('sort'):
+        # hn_list_sorted  = sorted(hn_list, key = itemgetter('age (h)'), reverse=True)
+        ## oldest first: an argsort of the kept rows over the ages column; the output dicts are made only for the kept stories
+        hn_list_sorted = batch.output(batch.argsort_age(kept))
+    if thread_comments:
+        with metrics.stage('threads'):
+            add_threads(hn_list_sorted, stories, session, store, now, metrics)
+    # print('\nhn_list_sorted:\n', hn_list_sorted)
+    return stories, run_diff, hn_list_sorted
+
+
+def previous_datetime(run_diff, now):
+    """ old_datetime: the last run (from the story store); now on the first run. """
+    if run_diff.previous_run is not None:
+        return datetime.fromtimestamp(run_diff.previous_run).replace(microsecond=0)
+    return now
+
+
+def is_new(item, new_ids):
+    return item['hn_url'].rsplit('=', 1)[1] in new_ids
+
+
+def report(stories, run_diff, old_datetime, now):
+    print('\nOld date, time:', old_datetime)
+    print('           now:', now.strftime('%Y-%m-%d %H:%M:%S'))
+
+    ## https://stackoverflow.com/questions/24217641/how-to-get-the-difference-between-two-dates-in-hours-minutes-and-seconds
+    date_diff = now - old_datetime
+
+    ## AttributeError: 'datetime.timedelta' object has no attribute 'hours'
+    # print('date_diff.seconds:', date_diff.seconds)
+    date_diff_hours = date_diff.seconds / 3600
+
+    print(' date_diff (h): {:0.4f}'.format(date_diff_hours))
+    print('           new: {} (of {} scraped)'.format(len(run_diff.new), len(stories)))
+    print(' score changed: {}'.format(len(run_diff.changed)))
+    for story, old_points, old_comments in run_diff.changed:
+        print('    votes {:>5} --> {:<5}  comments {:>5} --> {:<5}  {}'.format(str(old_points), str(story.points), str(old_comments), str(story.comments), story.title))
+    print()
+
+
+def write_results(hn_list_sorted, new_ids, old_datetime, metrics=NULL_METRICS):
+    """ Write (and postprocess) the results: stories already in the store before this run, then the stories first seen in this run. """
+    with metrics.stage('write'), open_output(output_path, output_format, translator=hn_translator) as out:
+        for item in hn_list_sorted:
+            if not is_new(item, new_ids):
+                out.write(item)
+        out.section('New since last run: {}'.format(old_datetime))
+        for item in hn_list_sorted:
+            if is_new(item, new_ids):
+                out.write(item)
+
+# ============================================================================
+## CHANGE DETECTION:
+
+## the values of a record that move from run to run without changing the layout: patched in place
+SCORE_FIELDS = ('votes', 'comments', 'age (h)')
+LAYOUT_FINGERPRINTS = ('kept', 'scores', 'banner', 'new ids')
+
+
+def digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def settings_fingerprint():
+    """ Everything (besides the front page) that shapes the output. """
+    return digest([story_filter.rules, hn_dict, output_format, os.path.abspath(output_path), parser_backend, hn_site_url, crawl_endpoints,
+                   crawl_pages, thread_comments, thread_top_n])
+
+
+def load_fingerprints(store):
+    """ The last run's fingerprints; {} if they do not describe output_path as it is (other settings, no output file) or are off. """
+    if not change_detection or output_path == '-' or not os.path.exists(output_path):
+        return {}
+    fingerprints = store.fingerprints()
+    return fingerprints if fingerprints.get('settings') == settings_fingerprint() else {}
+
+
+def page_digests(fingerprints):
+    return {name[5:]: value for name, value in fingerprints.items() if name.startswith('page ')}
+
+
+def output_layout(hn_list_sorted, new_ids, old_datetime, fingerprints):
+    """ (new_ids, banner time) to write the results with: this run's -- or, if the run found no new (kept) stories, the sections and
+        banner output_path was last written with (as watch mode leaves them), so that a run in which only scores moved can be patched.
+    """
+    if 'banner' in fingerprints and not any(is_new(item, new_ids) for item in hn_list_sorted):
+        return set(fingerprints['new ids'].split()), fingerprints['banner']
+    return new_ids, old_datetime
+
+
+def kept_fingerprints(hn_list_sorted, new_ids, old_datetime):
+    """ {name: value} of the output layout: 'kept' (the kept stories less their scores, in order, and the section each is in), 'scores',
+        and -- to write the same sections again -- the 'banner' time and the 'new ids' (those in the "New since last run" section).
+    """
+    return {'kept': digest([[{k: v for k, v in item.items() if k not in SCORE_FIELDS}, is_new(item, new_ids)] for item in hn_list_sorted]),
+            'scores': digest([[item[k] for k in SCORE_FIELDS] for item in hn_list_sorted]),
+            'banner': str(old_datetime),
+            'new ids': ' '.join(sorted(new_ids))}
+
+
+def save_fingerprints(store, pages, kept=None):
+    """ After a run: the page digests; the layout fingerprints if output_path was written (else the last ones are kept). """
+    if not change_detection:
+        return
+    settings = settings_fingerprint()
+    previous = store.fingerprints()
+    fingerprints = {name: previous[name] for name in LAYOUT_FINGERPRINTS if name in previous and previous.get('settings') == settings}
+    fingerprints.update({'page ' + url: value for url, value in pages.items()}, settings=settings)
+    if kept is not None:
+        fingerprints.update(kept)
+    store.save_fingerprints(fingerprints)
+
+
+def update_results(hn_list_sorted, new_ids, old_datetime, fingerprints, metrics=NULL_METRICS):
+    """ write_results() -- unless only scores changed since output_path was written (patch them), or nothing did.  Returns the layout
+        fingerprints (kept_fingerprints()).
+    """
+    new_ids, old_datetime = output_layout(hn_list_sorted, new_ids, old_datetime, fingerprints)
+    kept = kept_fingerprints(hn_list_sorted, new_ids, old_datetime)
+    if fingerprints.get('kept') == kept['kept']:
+        if fingerprints.get('scores') == kept['scores']:
+            metrics.count('write_skipped')
+            return kept
+        if output_format in PATCH_FORMATS:
+            with metrics.stage('patch'):
+                patched = patch_scores(output_path, output_format, {item['hn_url']: {k: item[k] for k in SCORE_FIELDS} for item in hn_list_sorted},
+                                       translator=hn_translator)
+            metrics.count('records_patched', patched)
+            return kept
+    write_results(hn_list_sorted, new_ids, old_datetime, metrics)
+    return kept
+
+# ============================================================================
+## WATCH MODE:
+
+def notify(count):
+    """ Run notify_command (if set); a failing hook is reported, not fatal. """
+    if not notify_command:
+        return
+    path = os.path.abspath(output_path) if output_path != '-' else '-'
+    args = [arg.format(count=count, path=path, dir=os.path.dirname(path)) for arg in notify_command]
+    import subprocess
+    try:
+        subprocess.run(args, timeout=30)
+    except (OSError, subprocess.SubprocessError) as e:
+        print('notify_command failed: {}'.format(e))
+
+
+def next_interval(interval, change_rate):
+    """ Adapt the poll interval to how fast the front page changes. """
+    if change_rate > watch_fast_change:
+        interval = interval / 2
+    elif change_rate == 0:
+        interval = interval * 1.5
+    return min(max(interval, watch_min_interval), watch_max_interval)
+
+
+def jittered(seconds):
+    return seconds * random.uniform(1 - watch_jitter, 1 + watch_jitter)
+
+
+def watch(session, cache, store, scheduler=None):
+    """ Poll until SIGTERM / SIGINT; write the results and notify only when a poll finds new (kept) stories. """
+    import signal
+    import threading
+    stop = threading.Event()
+    ## SIGINT (Ctrl-C) too: a poll in progress is finished (results written, fingerprints saved), then the loop ends, and main()
+    ## still closes the store and dumps the profile:
+    handlers = {signum: signal.signal(signum, lambda signum, frame: stop.set()) for signum in (signal.SIGTERM, signal.SIGINT)}
+    interval = watch_interval
+    errors = 0
+    while not stop.is_set():
+        now = datetime.now()
+        metrics = RunMetrics()
+        pages = page_digests(load_fingerprints(store)) if change_detection else None
+        try:
+            result = scrape(session, cache, store, now, metrics, digests=pages, scheduler=scheduler)
+        except Exception as e:
+            ## exponential backoff (capped), e.g. network down / HN unavailable:
+            errors += 1
+            wait = min(interval * 2**errors, watch_max_interval)
+            print('{}  poll failed ({}): {}; retrying in {:.0f} s'.format(now.strftime('%Y-%m-%d %H:%M:%S'), errors, e, wait))
+        else:
+            errors = 0
+            if result is None:
+                ## front page unchanged: a poll with nothing new
+                if metrics_path:
+                    metrics.emit(metrics_path)
+                interval = wait = next_interval(interval, 0)
+                print('{}  front page unchanged; next poll in ~{:.0f} s'.format(now.strftime('%Y-%m-%d %H:%M:%S'), wait))
+            else:
+                stories, run_diff, hn_list_sorted = result
+                new_ids = set(story.id for story in run_diff.new)
+                delta = [item for item in hn_list_sorted if is_new(item, new_ids)]
+                kept = None
+                if delta:
+                    old_datetime = previous_datetime(run_diff, now)
+                    write_results(hn_list_sorted, new_ids, old_datetime, metrics)
+                    kept = kept_fingerprints(hn_list_sorted, new_ids, old_datetime)
+                    notify(len(delta))
+                if pages is not None:
+                    save_fingerprints(store, pages, kept)
+                if metrics_path:
+                    metrics.emit(metrics_path)
+                interval = next_interval(interval, len(run_diff.new) / max(len(stories), 1))
+                wait = interval
+                print('{}  {} scraped, {} new, {} kept new, {} score changed; next poll in ~{:.0f} s'.format(
+                    now.strftime('%Y-%m-%d %H:%M:%S'), len(stories), len(run_diff.new), len(delta), len(run_diff.changed), wait))
+        stop.wait(jittered(wait))
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
 
 # ============================================================================
-## RESET PRINT REDIRECTS:
+## MAIN:
+
+def run(session, cache, store, now=None, metrics=NULL_METRICS, quiet=False, scheduler=None):
+    """ One run: scrape, report (unless quiet), write the results.  Returns (stories, run_diff, hn_list_sorted); None if the front page
+        had not changed since the last run (nothing done after the fetch), or could not be fetched (output_path left as it was).
+    """
+    from hn_fetch import FetchError
+    now = now or datetime.now()
+    fingerprints = load_fingerprints(store)
+    pages = page_digests(fingerprints) if change_detection else None
+    try:
+        result = scrape(session, cache, store, now, metrics, digests=pages, scheduler=scheduler)
+    except FetchError as e:
+        metrics.count('run_degraded')
+        if not quiet:
+            print('\nHacker News unavailable ({}): {} left as it is.\n'.format(e, output_path))
+        return None
+    if result is None:
+        metrics.count('run_unchanged')
+        if not quiet:
+            print('\nFront page unchanged since the last run: {} left as it is.\n'.format(output_path))
+        return None
+    stories, run_diff, hn_list_sorted = result
+    old_datetime = previous_datetime(run_diff, now)
+    if not quiet:
+        report(stories, run_diff, old_datetime, now)
+    kept = update_results(hn_list_sorted, set(story.id for story in run_diff.new), old_datetime, fingerprints, metrics)
+    if pages is not None:
+        save_fingerprints(store, pages, kept)
+    return stories, run_diff, hn_list_sorted
+
+
+def show(path=None):
+    """ hn.py show : print the last results (output_path) as written.  Returns the exit status. """
+    path = path or output_path
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        print('hn.py show: {} ({}); run hn.py fetch first'.format(path, e.strerror), file=sys.stderr)
+        return 1
+    try:
+        sys.stdout.buffer.write(data)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        ## e.g. hn.py show | head
+        sys.stderr.close()
+    return 0
+
+
+def open_fetch():
+    """ (session, cache, store, scheduler) for fetch / watch. """
+    from hn_fetch import ResponseCache, make_session
+    from hn_schedule import FetchScheduler
+    from hn_store import StoryStore
+    session = make_session(pool_size=max(crawl_per_host, thread_workers) if thread_comments else crawl_per_host)
+    cache = ResponseCache(cache_dir, ttl=cache_ttl, max_bytes=cache_max_bytes, cache_stories=cache_stories) if cache_dir else None
+    store = StoryStore(store_path)
+    scheduler = FetchScheduler(rate=fetch_rate, burst=fetch_burst, timeout=fetch_timeout, deadline=fetch_deadline, retries=fetch_retries,
+                               backoff=fetch_backoff, failures=breaker_failures, reset=breaker_reset)
+    return session, cache, store, scheduler
+
+
+COMMANDS = ('fetch', 'show', 'watch', 'analyze')
+
+
+def main(argv=None):
+    """ hn.py [fetch] [--show] [--comments] ... | hn.py show [PATH] | hn.py watch [--comments] ... | hn.py analyze DIR ...  Returns the exit status. """
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv[:1] and argv[0] in COMMANDS else 'fetch'
+    if argv[:1] == [command]:
+        argv = argv[1:]
+    if command == 'analyze':
+        from hn_analyze import main as analyze
+        return analyze(argv, index_path=history_index)
+
+    parser = argparse.ArgumentParser(prog='hn.py ' + command, description={
+        'fetch': 'Scrape and filter the Hacker News front page; write the results to output_path (see the notes at the top of hn.py)',
+        'show': 'Print the last results (output_path) without fetching',
+        'watch': 'Keep running: poll adaptively, write / notify only when there are new stories'}[command],
+        epilog='commands: hn.py fetch (default) | show | watch | analyze DIR')
+    if command == 'show':
+        parser.add_argument('path', nargs='?', default=None, help='results file (default: output_path)')
+        return show(parser.parse_args(argv).path)
+    if command == 'fetch':
+        parser.add_argument('--show', action='store_true', help='then print the results (hn.py show)')
+        parser.add_argument('--watch', action='store_true', help='same as: hn.py watch')
+    parser.add_argument('--profile', metavar='FILE', help='run under cProfile; save the stats to FILE and print the top functions')
+    parser.add_argument('--tracemalloc', action='store_true', help='trace memory allocations: peak memory per stage in the metrics')
+    parser.add_argument('--comments', action='store_true', help='fetch the kept stories\' comment threads (see thread_comments)')
+    args = parser.parse_args(argv)
+
+    global thread_comments
+    thread_comments = thread_comments or args.comments
+
+    if args.tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    session, cache, store, scheduler = open_fetch()
+    if command == 'watch' or args.watch:
+        watch(session, cache, store, scheduler)
+    else:
+        metrics = RunMetrics()
+        run(session, cache, store, metrics=metrics, scheduler=scheduler)
+        if metrics_path:
+            metrics.emit(metrics_path)
+    store.close()
+
+    if args.profile:
+        import pstats
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+    if command == 'fetch' and args.show:
+        return show()
+    return 0
+
 
-## https://stackoverflow.com/questions/4110891/how-to-redirect-the-output-of-print-to-a-txt-file
-sys.stdout = sys.__stdout__
+if __name__ == '__main__':
+    sys.exit(main())
 
 # ============================================================================
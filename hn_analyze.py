@@ -0,0 +1,251 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_analyze.py
+        about: history of the saved hn.txt snapshots: a compact per-story index (process pool ingest) --> top domains, score velocity, keyword trends
+        title: Hacker News Scraper history analytics
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 02
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : HistoryIndex: incremental ingest (new / changed files only) over a process pool; JSON index file; three reports
+    * v02 : number(): numeric strings count (hn.py writes 'comments' as a string, e.g. "80": JSON Lines snapshots had 0 comments)
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py                  ## << hn.py analyze DIR ...; history_index
+    * /mnt/Vancouver/programming/python/scripts/hn_output.py           ## << read_snapshot()
+    * /mnt/Vancouver/programming/python/scripts/hn-analyze_bench.py    ## << ingest timing over synthetic years of snapshots
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn.py analyze DIR [--top 20] [--keyword rust --keyword covid ...] [--workers N]
+
+Snapshots: every *.txt (raw JSON-ish or postprocessed hn.txt layout; hn_output.read_snapshot) and *.jsonl (output_format 'jsonl') file
+under DIR, at any depth.  A snapshot's date comes from its file name (hn.2020.05.03.raw.txt, hn-2020-05-03.txt, ...), else from its
+"Older results: 2020-05-03 ..." / "New since last run: ..." banner, else from the file's modification time.
+
+The index holds one entry per HN item id -- [first seen, last seen, peak points, peak comments, peak velocity, domain, title] -- and
+the (size, mtime) of each file it has read, so a re-run reads only the new or changed files.  (Merging is min / max per field, so
+reading a file twice changes nothing.)  Files are read in chunks by a process pool; each worker returns one merged partial index per
+chunk, so only the compact entries cross the process boundary.
+
+    * top domains   : stories per domain (self posts: news.ycombinator.com), with their summed peak points
+    * velocity      : points per hour of age (age < 1 h counts as 1 h), the highest seen for each story
+    * keyword trends: stories first seen per month whose title contains the keyword (case-insensitive)
+==============================================================================
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from hn_filter import compile_keywords, domain_of
+from hn_output import read_snapshot
+
+SNAPSHOT_SUFFIXES = ('.txt', '.jsonl')
+FILE_DATE_RE = re.compile(r'(\d{4})[-._](\d{2})[-._](\d{2})')
+BANNER_DATE_RE = re.compile(r'(?:Older results|New since last run):\s*(\d{4})-(\d{2})-(\d{2})')
+CHUNK_FILES = 200
+SELF_POST_DOMAIN = 'news.ycombinator.com'
+
+## index entry fields:
+FIRST, LAST, POINTS, COMMENTS, VELOCITY, DOMAIN, TITLE = range(7)
+
+# ----------------------------------------------------------------------------
+## INGEST (worker processes):
+## --------------------------
+
+def snapshot_date(path, text):
+    """ 'YYYY-MM-DD': from the file name, else the section banner, else the file's mtime. """
+    m = FILE_DATE_RE.search(os.path.basename(path)) or BANNER_DATE_RE.search(text)
+    if m:
+        return '{}-{}-{}'.format(*m.groups())
+    return date.fromtimestamp(os.path.getmtime(path)).isoformat()
+
+
+def snapshot_records(path, text):
+    if path.endswith('.jsonl'):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return read_snapshot(text)
+
+
+def number(value):
+    """ votes / comments / age as read back: int, float, or a numeric string ('80'); anything else ('None', '3 hours ago') --> None. """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                value = float(value)
+            except ValueError:
+                return None
+            return value if math.isfinite(value) else None
+    return None
+
+
+def merge_entry(index, hn_id, entry):
+    old = index.get(hn_id)
+    if old is None:
+        index[hn_id] = entry
+        return
+    old[FIRST] = min(old[FIRST], entry[FIRST])
+    old[LAST] = max(old[LAST], entry[LAST])
+    for i in (POINTS, COMMENTS, VELOCITY):
+        old[i] = max(old[i], entry[i])
+
+
+def index_files(paths):
+    """ Partial index {id: entry} of the snapshot files, and {path: [size, mtime]} of the files read. """
+    index = {}
+    files = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError:
+            continue
+        files[path] = [st.st_size, st.st_mtime]
+        seen = snapshot_date(path, text)
+        for record in snapshot_records(path, text):
+            hn_url = record.get('hn_url')
+            if not isinstance(hn_url, str) or '=' not in hn_url:
+                continue
+            hn_id = hn_url.rsplit('=', 1)[1]
+            points = number(record.get('votes')) or 0
+            comments = number(record.get('comments')) or 0
+            age = number(record.get('age (h)'))
+            velocity = round(points / max(age, 1.0), 2) if age is not None else 0.0
+            domain = domain_of(record.get('ext_link')) or SELF_POST_DOMAIN
+            merge_entry(index, hn_id, [seen, seen, points, comments, velocity, domain, str(record.get('title', ''))])
+    return index, files
+
+# ----------------------------------------------------------------------------
+## INDEX:
+## ------
+
+def snapshot_files(root):
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(SNAPSHOT_SUFFIXES))
+    return sorted(paths)
+
+
+class HistoryIndex:
+
+    def __init__(self, path=None):
+        """ path: the index file (JSON); None : in memory only. """
+        self.path = path
+        self.files = {}
+        self.stories = {}
+        if path is not None and os.path.isfile(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self.files, self.stories = data['files'], data['stories']
+
+    def update(self, root, workers=None, chunk_files=CHUNK_FILES):
+        """ Read the new / changed snapshot files under root; returns how many were read. """
+        stale = []
+        for path in snapshot_files(root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if self.files.get(path) != [st.st_size, st.st_mtime]:
+                stale.append(path)
+        chunks = [stale[i:i + chunk_files] for i in range(0, len(stale), chunk_files)]
+        if len(chunks) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(index_files, chunks))
+        else:
+            results = [index_files(chunk) for chunk in chunks]
+        for index, files in results:
+            for hn_id, entry in index.items():
+                merge_entry(self.stories, hn_id, entry)
+            self.files.update(files)
+        return len(stale)
+
+    def save(self):
+        if self.path is None:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'files': self.files, 'stories': self.stories}, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    # ------------------------------------------------------------------------
+    ## REPORTS:
+
+    def top_domains(self, n=20):
+        """ [(domain, stories, summed peak points)], most stories first. """
+        stories, points = Counter(), Counter()
+        for entry in self.stories.values():
+            stories[entry[DOMAIN]] += 1
+            points[entry[DOMAIN]] += entry[POINTS]
+        return [(domain, count, points[domain]) for domain, count in stories.most_common(n)]
+
+    def velocity(self, n=20):
+        """ [(id, entry)], highest peak velocity first. """
+        return sorted(self.stories.items(), key=lambda item: item[1][VELOCITY], reverse=True)[:n]
+
+    def keyword_trends(self, keywords):
+        """ {keyword: {'YYYY-MM': stories first seen that month with the keyword in the title}}. """
+        trends = {}
+        for keyword in keywords:
+            regex = compile_keywords([keyword])
+            months = defaultdict(int)
+            for entry in self.stories.values():
+                if regex.search(entry[TITLE]):
+                    months[entry[FIRST][:7]] += 1
+            trends[keyword] = dict(sorted(months.items()))
+        return trends
+
+# ----------------------------------------------------------------------------
+## MAIN (hn.py analyze):
+## ---------------------
+
+def main(argv=None, index_path=None):
+    parser = argparse.ArgumentParser(prog='hn.py analyze', description='Index saved hn.txt snapshots; report top domains, score velocity, keyword trends')
+    parser.add_argument('dir', help='directory of snapshot files (searched recursively)')
+    parser.add_argument('--index', default=index_path, help='index file (default: %(default)s); "" : do not keep one')
+    parser.add_argument('--workers', type=int, default=None, help='ingest processes (default: one per CPU)')
+    parser.add_argument('--top', type=int, default=20, help='rows per report')
+    parser.add_argument('--keyword', action='append', default=[], help='keyword for the trends report (repeatable)')
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    history = HistoryIndex(args.index or None)
+    read = history.update(args.dir, workers=args.workers)
+    history.save()
+    print('{} snapshot files ({} read now), {} stories; {:.2f} s\n'.format(len(history.files), read, len(history.stories), time.perf_counter() - t0))
+
+    print('Top domains:')
+    for domain, count, points in history.top_domains(args.top):
+        print('    {:>6}  {:>9} points  {}'.format(count, points, domain))
+
+    print('\nScore velocity (peak points / hour of age):')
+    for hn_id, entry in history.velocity(args.top):
+        print('    {:>9.2f}  {:>5} points  {}  {}  (https://news.ycombinator.com/item?id={})'.format(
+            entry[VELOCITY], entry[POINTS], entry[FIRST], entry[TITLE], hn_id))
+
+    for keyword, months in history.keyword_trends(args.keyword).items():
+        print('\nKeyword trend: {!r} ({} stories)'.format(keyword, sum(months.values())))
+        for month, count in months.items():
+            print('    {}  {:>5}  {}'.format(month, count, '#' * min(count, 100)))
+
+# ============================================================================
@@ -0,0 +1,109 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_comments.py
+        about: comment threads for hn.py: true comment counts and the top comments of the kept stories (Hacker News Firebase API)
+        title: Hacker News Scraper comment threads
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 02
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : fetch_threads(): all threads walked level by level over one bounded thread pool and a shared session; no recursion
+    * v02 : a thread with any item not fetched (not just the story) is left out of the results (was: stored undercounted, as final)
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py             ## << thread_comments (or --comments); add_threads()
+    * /mnt/Vancouver/programming/python/scripts/hn_store.py       ## << threads table: skips threads whose comment count is unchanged
+    * /mnt/Vancouver/programming/python/scripts/hn_standin.py     ## << serves synthetic /v0/item/<id>.json items
+    * https://github.com/HackerNews/API
+
+Each item (story or comment) is one request: <api_url>item/<id>.json --> {"id", "type", "by", "text", "kids": [...], "deleted", "dead", ...};
+an unknown id is null.  The comment tree is walked breadth-first, one level at a time, for all threads together: every item of the
+current level (of every thread) goes to the pool at once, and their kids make up the next level.  So the pool stays busy however the
+comments are spread over the threads, a deep thread costs a level per reply depth (not a stack frame), and nothing waits on a nested
+pool task.
+
+Thread(id, count, top): count is the number of live comments in the tree (deleted / dead ones are not counted, their replies are);
+top is the first top_n live top-level comments, in HN's ranking order, as 'user: text' (plain text, shortened to TOP_COMMENT_WIDTH).
+A thread any of whose items -- the story or a comment, at any depth -- can not be fetched is left out of the results, and the rest of
+its tree is not fetched: hn.py does not store it, and fetches it again on the next run.  (An item the API answers null for does not
+exist: it is skipped.)
+==============================================================================
+"""
+
+import html
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from hn_metrics import NULL_METRICS
+
+HN_API_URL = 'https://hacker-news.firebaseio.com/v0/'
+TOP_COMMENT_WIDTH = 240
+
+Thread = namedtuple('Thread', ['id', 'count', 'top'])
+
+TAG_RE = re.compile(r'<[^>]*>')
+SPACE_RE = re.compile(r'\s+')
+
+
+def item_url(api_url, item_id):
+    return '{}item/{}.json'.format(api_url, item_id)
+
+
+def fetch_item(session, url, timeout=10):
+    """ The item (dict) at url; {} if it does not exist (the API's null); None if it can not be fetched. """
+    try:
+        res = session.get(url, timeout=timeout)
+        if res.status_code != 200:
+            return None
+        return res.json() or {}
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def comment_text(item, width=TOP_COMMENT_WIDTH):
+    """ 'user: text' -- the comment's HTML as one line of plain text, shortened to width. """
+    text = SPACE_RE.sub(' ', html.unescape(TAG_RE.sub(' ', item.get('text') or ''))).strip()
+    text = '{}: {}'.format(item.get('by', '?'), text)
+    return text if len(text) <= width else text[:width - 3].rstrip() + '...'
+
+
+def fetch_threads(session, ids, api_url=HN_API_URL, top_n=3, workers=8, metrics=NULL_METRICS):
+    """ {story id: Thread} for the story ids (see the notes at the top of this file). """
+    ids = list(ids)
+    counts = dict.fromkeys(ids, 0)
+    tops = {hn_id: [] for hn_id in ids}
+    failed = set()
+    ## (thread, item id, depth): depth 0 is the story itself
+    level = [(hn_id, hn_id, 0) for hn_id in ids]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            ## map() returns the items in level order, so the top-level comments stay in ranking order:
+            items = pool.map(lambda entry: fetch_item(session, item_url(api_url, entry[1])), level)
+            next_level = []
+            for (thread, item_id, depth), item in zip(level, items):
+                metrics.count('thread_items')
+                if item is None or (depth == 0 and not item):
+                    ## an item (and its replies) missing would undercount the thread -- and the store would keep that as final
+                    failed.add(thread)
+                    continue
+                if thread in failed or not item:
+                    continue
+                if depth > 0 and not (item.get('deleted') or item.get('dead')):
+                    counts[thread] += 1
+                    if depth == 1 and len(tops[thread]) < top_n:
+                        tops[thread].append(comment_text(item))
+                next_level.extend((thread, kid, depth + 1) for kid in item.get('kids', ()))
+            level = [entry for entry in next_level if entry[0] not in failed]
+    return {hn_id: Thread(hn_id, counts[hn_id], tops[hn_id]) for hn_id in ids if hn_id not in failed}
+
+# ============================================================================
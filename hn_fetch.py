@@ -0,0 +1,290 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_fetch.py
+        about: Hacker News page fetching for hn.py: concurrent multi-page crawl over a shared keep-alive session
+        title: Hacker News Scraper fetcher
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 05
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : crawl(): N pages x listing endpoints {news | newest | best | ask | show}, bounded thread pool, per-host limit, dedupe by item id
+    * v02 : ResponseCache: on-disk response cache (TTL, conditional GET revalidation, size cap / LRU eviction, optional parsed stories)
+    * v03 : metrics (hn_metrics.py): 'fetch' / 'parse' stages; pages, bytes fetched, cache hits
+    * v04 : page digests (crawl(..., digests=...)): when every page is the same as last time, nothing is parsed and crawl() returns None
+    * v05 : FetchError: a page that cannot be fetched (HTTP error, no answer) is never parsed; timeouts; crawl(..., scheduler=...) (hn_schedule.py)
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py                 ## << uses crawl()
+    * /mnt/Vancouver/programming/python/scripts/hn_schedule.py        ## << FetchScheduler: rate limit, deadlines, retries, circuit breaker
+    * /mnt/Vancouver/programming/python/scripts/hn_standin.py         ## << local HTTP stand-in (serves saved / synthetic pages)
+    * /mnt/Vancouver/programming/python/scripts/hn-crawl_bench.py     ## << sequential vs. concurrent crawl timing
+
+The pages are fetched concurrently (a fetch is almost all network wait), over one requests.Session whose connection pool is sized to the
+per-host limit, so the TCP/TLS connections are reused across pages.  Each page is parsed in its worker (hn_parse.parse_stories), and
+the results are merged in listing order: endpoints in the given order, then page number; the first occurrence of an item id wins.
+
+ResponseCache (optional; crawl(..., cache=...)) keeps one JSON file per URL: body, ETag / Last-Modified, fetch time and (optionally) the
+parsed Story records.  Within the TTL a page is served from disk without a request -- and, with the stories cached, without parsing
+either.  Past the TTL the page is revalidated with If-None-Match / If-Modified-Since; a 304 renews the entry.  Total size is capped:
+the least recently used entries (file mtime, renewed on each hit) are evicted first.
+
+Page digests (optional; crawl(..., digests={url: digest}), updated in place): each page body -- fetched, or from the cache -- is hashed
+(SHA-1) and compared with the digest from the last run.  A changed page is parsed in its worker as usual; an unchanged one is not
+parsed yet.  If no page changed, crawl() returns None without parsing anything (hn.py then stops: nothing to do); otherwise the
+unchanged pages are parsed too, and the full story list is returned.
+
+Errors: only a 200 (or, for a cached page, a 304) is parsed.  Any other answer -- e.g. a 503 whose error page would parse to no
+stories at all -- raises FetchError, as does a request that fails outright; requests time out after FETCH_TIMEOUT (connect, read) s.
+With a scheduler (hn_schedule.FetchScheduler; crawl(..., scheduler=...)) the requests are also rate limited and retried, under a
+per-request deadline and a circuit breaker.
+==============================================================================
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hn_metrics import NULL_METRICS
+from hn_parse import Story, parse_stories
+
+HN_BASE_URL = 'https://news.ycombinator.com/'
+ENDPOINTS = ('news', 'newest', 'best', 'ask', 'show')
+## (connect, read) seconds, without a scheduler:
+FETCH_TIMEOUT = (5, 20)
+
+
+class FetchError(Exception):
+    """ A listing page could not be fetched (no answer, or not a 200 / 304). """
+
+# ----------------------------------------------------------------------------
+## SESSION:
+## --------
+
+def make_session(pool_size=4):
+    """ A requests.Session with a keep-alive connection pool of pool_size connections per host. """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# ----------------------------------------------------------------------------
+## CRAWL:
+## ------
+
+def listing_urls(endpoints=('news',), pages=1, base_url=HN_BASE_URL):
+    """ news, news?p=2, ..., newest, newest?p=2, ... """
+    urls = []
+    for endpoint in endpoints:
+        if endpoint not in ENDPOINTS:
+            raise ValueError('unknown listing endpoint: {!r} (use any of {})'.format(endpoint, ', '.join(ENDPOINTS)))
+        for p in range(1, pages + 1):
+            urls.append(base_url + endpoint + ('?p={}'.format(p) if p > 1 else ''))
+    return urls
+
+
+def dedupe_stories(stories):
+    """ Drop repeated HN item ids (e.g. a story on both 'news' and 'best'), keeping the first occurrence. """
+    seen = set()
+    out = []
+    for story in stories:
+        if story.id not in seen:
+            seen.add(story.id)
+            out.append(story)
+    return out
+
+
+class HostLimiter:
+    """ At most `limit` requests in flight per host. """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self._semaphores[host]
+
+
+class ResponseCache:
+    """ On-disk HTTP response cache, keyed by URL (see the notes at the top of this file). """
+
+    def __init__(self, path, ttl=300, max_bytes=20 * 2**20, cache_stories=True):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.cache_stories = cache_stories
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, url):
+        return os.path.join(self.path, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        """ The cached entry for url (dict: url, body, etag, last_modified, fetched, stories) or None. """
+        path = self._file(url)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            ## LRU: a hit makes the entry most recently used:
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry.get('stories') is not None:
+            entry['stories'] = [Story(*row) for row in entry['stories']]
+        return entry
+
+    def fresh(self, entry):
+        return time.time() - entry['fetched'] < self.ttl
+
+    def put(self, url, body, etag=None, last_modified=None, stories=None):
+        entry = {'url': url, 'body': body, 'etag': etag, 'last_modified': last_modified, 'fetched': time.time(),
+                 'stories': [list(story) for story in stories] if (stories is not None and self.cache_stories) else None}
+        path = self._file(url)
+        tmp = '{}.{}.tmp'.format(path, threading.get_ident())
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        self.evict()
+
+    def renew(self, url, entry):
+        """ After a 304 Not Modified: same body, new fetch time. """
+        self.put(url, entry['body'], entry['etag'], entry['last_modified'], entry['stories'])
+
+    def evict(self):
+        """ Delete least recently used entries until the cache fits in max_bytes. """
+        with self._lock:
+            files = []
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    try:
+                        st = os.stat(os.path.join(self.path, name))
+                    except FileNotFoundError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, name))
+            total = sum(size for _, size, _ in files)
+            for _, size, name in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+def page_digest(body):
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+
+def unless_unchanged(url, body, digests, parse, metrics=NULL_METRICS):
+    """ parse() -- unless digests says the page is the same as last time: then parse itself, to call only if needed (see crawl()). """
+    if digests is None:
+        return parse()
+    digest = page_digest(body)
+    unchanged = digests.get(url) == digest
+    digests[url] = digest
+    if unchanged:
+        metrics.count('pages_unchanged')
+        return parse
+    return parse()
+
+
+def get_page(session, url, headers, scheduler=None, metrics=NULL_METRICS):
+    """ session.get(url) -- through the scheduler if given; FetchError if there is no answer. """
+    if scheduler is not None:
+        return scheduler.get(session, url, headers=headers, metrics=metrics)
+    try:
+        return session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+    except requests.RequestException as e:
+        raise FetchError('{}: {}'.format(url, e)) from e
+
+
+def fetch_stories(session, url, backend='html.parser', cache=None, metrics=NULL_METRICS, digests=None, scheduler=None):
+    """ Story records of one listing page; through the ResponseCache if given.  With digests: see unless_unchanged().  FetchError
+        unless the page is answered with a 200 (or a 304, for a cached page).
+    """
+    metrics.count('pages')
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and cache.fresh(entry):
+        metrics.count('cache_fresh')
+        return unless_unchanged(url, entry['body'], digests, lambda: cached_stories(entry, backend, metrics), metrics)
+    headers = {}
+    if entry is not None:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+    with metrics.stage('fetch'):
+        res = get_page(session, url, headers, scheduler, metrics)
+    metrics.count('bytes_fetched', len(res.content))
+    if entry is not None and res.status_code == 304:
+        metrics.count('cache_not_modified')
+        cache.renew(url, entry)
+        return unless_unchanged(url, entry['body'], digests, lambda: cached_stories(entry, backend, metrics), metrics)
+    if res.status_code != 200:
+        raise FetchError('{}: HTTP {}'.format(url, res.status_code))
+
+    def parse():
+        with metrics.stage('parse'):
+            stories = parse_stories(res.text, backend=backend)
+        ## (not a page without stories -- e.g. an overload page: the next run should ask again)
+        if cache is not None and stories:
+            cache.put(url, res.text, res.headers.get('ETag'), res.headers.get('Last-Modified'), stories)
+        return stories
+
+    return unless_unchanged(url, res.text, digests, parse, metrics)
+
+
+def cached_stories(entry, backend, metrics=NULL_METRICS):
+    if entry['stories'] is not None:
+        return entry['stories']
+    with metrics.stage('parse'):
+        return parse_stories(entry['body'], backend=backend)
+
+
+def crawl(session, endpoints=('news',), pages=1, base_url=HN_BASE_URL, backend='html.parser', workers=8, per_host=4, cache=None,
+          metrics=NULL_METRICS, digests=None, scheduler=None):
+    """ Fetch and parse `pages` pages of each listing endpoint concurrently; return the deduped Story list (listing order).
+
+        digests ({url: page digest}, updated): None is returned if no page changed (see the notes at the top of this file).
+        FetchError if any page could not be fetched; scheduler: hn_schedule.FetchScheduler (rate limit, retries, ...) or None.
+    """
+    urls = listing_urls(endpoints, pages, base_url)
+    limiter = HostLimiter(per_host)
+
+    def fetch_and_parse(url):
+        with limiter(url):
+            return fetch_stories(session, url, backend=backend, cache=cache, metrics=metrics, digests=digests, scheduler=scheduler)
+
+    if len(urls) == 1:
+        results = [fetch_and_parse(urls[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+            ## map() returns the results in URL (listing) order:
+            results = list(pool.map(fetch_and_parse, urls))
+    if digests is not None:
+        if all(callable(page) for page in results):
+            return None
+        results = [page() if callable(page) else page for page in results]
+    return dedupe_stories(story for page in results for story in page)
+
+# ============================================================================
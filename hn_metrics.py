@@ -0,0 +1,157 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_metrics.py
+        about: per-run instrumentation for hn.py: per-stage wall / CPU times, counters, drop reasons --> one JSON line per run
+        title: Hacker News Scraper metrics
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 03
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : RunMetrics (stage timers, counters, drop reasons, optional tracemalloc peaks); JSON Lines log; NULL_METRICS
+    * v02 : tracemalloc peaks on Python < 3.9 (no tracemalloc.reset_peak()); tracemalloc not imported here (only looked up if loaded)
+    * v03 : nested stages: an inner stage's reset_peak() no longer cuts the outer stage's peak_kb down to the inner one's
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py         ## << --profile, --tracemalloc; metrics_path
+    * /mnt/Vancouver/programming/python/scripts/hn_fetch.py   ## << 'fetch' / 'parse' stages, bytes fetched
+
+One line per run (hn.py appends it to metrics_path), e.g.:
+
+    {"run_at": "2020-05-03T06:00:02", "stages": {"fetch": {"wall_s": 0.41, "cpu_s": 0.01, "calls": 1}, "parse": {...}, ...},
+     "counters": {"pages": 1, "bytes_fetched": 41225, "stories_parsed": 30, "stories_kept": 24, "stories_dropped": 6, ...},
+     "dropped": {"comments": 4, "keyword": 2}}
+
+Stage times add up over calls; the 'fetch' / 'parse' stages run in the crawl's worker threads, so with a multi-page crawl their wall
+times add up to more than the 'crawl' stage that contains them.  CPU times are per thread (time.thread_time).  With tracemalloc
+tracing (hn.py --tracemalloc), each stage also records the peak traced memory while it ran ('peak_kb'; main-thread stages only).
+Stages nest (e.g. 'fetch' / 'parse' inside 'crawl' on a one-page crawl): an inner stage's tracemalloc.reset_peak() would hide the
+peak so far from the stages around it, so that peak is first folded into every open stage -- an outer stage's peak_kb covers its
+inner stages.
+Python < 3.9 cannot reset the traced peak: there a stage's 'peak_kb' is exact when the stage set a new overall peak, and otherwise
+the larger of the traced memory at its start and end (a lower bound).
+==============================================================================
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def tracing():
+    """ The tracemalloc module if it is tracing, else None.  (Whoever starts tracing has imported it; it is not imported here.) """
+    tracemalloc = sys.modules.get('tracemalloc')
+    return tracemalloc if tracemalloc is not None and tracemalloc.is_tracing() else None
+
+
+def stage_peak(tracemalloc, start):
+    """ Peak traced memory (bytes) since tracemalloc.get_traced_memory() returned start (see the notes at the top of this file). """
+    current, peak = tracemalloc.get_traced_memory()
+    if hasattr(tracemalloc, 'reset_peak') or peak > start[1]:
+        return peak
+    return max(start[0], current)
+
+
+## the traced peaks (bytes) of the main-thread stages now running, outermost first (Python 3.9+: see fold_peak())
+_open_peaks = []
+
+
+def fold_peak(tracemalloc):
+    """ The traced peak so far counts toward every open stage: recorded in each before tracemalloc.reset_peak() loses it. """
+    peak = tracemalloc.get_traced_memory()[1]
+    for frame in _open_peaks:
+        frame[0] = max(frame[0], peak)
+
+
+class RunMetrics:
+
+    def __init__(self):
+        self.run_at = datetime.now().replace(microsecond=0)
+        self.stages = {}
+        self.counters = Counter()
+        self.dropped = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        tracemalloc = tracing() if threading.current_thread() is threading.main_thread() else None
+        trace = tracemalloc is not None
+        frame = None
+        if trace:
+            if hasattr(tracemalloc, 'reset_peak'):
+                ## the enclosing stages keep the peak so far; this one starts from here
+                fold_peak(tracemalloc)
+                tracemalloc.reset_peak()
+                frame = [0]
+                _open_peaks.append(frame)
+            start = tracemalloc.get_traced_memory()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            if frame is not None:
+                fold_peak(tracemalloc)
+                _open_peaks.pop()
+            with self._lock:
+                s = self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0, 'calls': 0})
+                s['wall_s'] += wall
+                s['cpu_s'] += cpu
+                s['calls'] += 1
+                if trace:
+                    peak = frame[0] if frame is not None else stage_peak(tracemalloc, start)
+                    s['peak_kb'] = max(s.get('peak_kb', 0), peak // 1024)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def drop(self, reason):
+        with self._lock:
+            self.counters['stories_dropped'] += 1
+            self.dropped[reason] += 1
+
+    def as_dict(self):
+        stages = {name: dict(s, wall_s=round(s['wall_s'], 6), cpu_s=round(s['cpu_s'], 6)) for name, s in self.stages.items()}
+        return {'run_at': self.run_at.isoformat(), 'stages': stages, 'counters': dict(self.counters), 'dropped': dict(self.dropped)}
+
+    def emit(self, path):
+        """ Append this run as one JSON line to path ('-' : print it). """
+        line = json.dumps(self.as_dict())
+        if path == '-':
+            print(line)
+            return
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(line + '\n')
+
+
+class NullMetrics:
+    """ Same interface as RunMetrics; records nothing. """
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def count(self, name, n=1):
+        pass
+
+    def drop(self, reason):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+# ============================================================================
@@ -0,0 +1,410 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_output.py
+        about: output for hn.py: story writers (text | jsonl | csv | html; atomic replace) and the postprocessing substitutions (Translator)
+        title: Hacker News Scraper output
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 06
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : Translator (compiled once per replacement table; str.replace / str.translate fast path); TranslatingWriter (substitutes while writing)
+    * v02 : story writers: 'text' (the hn.txt layout) | 'jsonl' | 'csv' | 'html' (mail-ready); open_output(): buffered, atomic rename
+    * v03 : read_snapshot(): story records back from hn.txt snapshots (raw JSON-ish or postprocessed)
+    * v04 : list values (hn.py 'top comments'): one per line in a CSV cell; a nested list in HTML
+    * v05 : patch_scores(): new votes / comments into an existing 'text' or 'jsonl' output file, in place of a full write
+    * v06 : patch_scores(): any record values ({hn_url: {key: value}}; hn.py: votes, comments, age), written as the writers write them
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py                   ## << hn_dict
+    * /mnt/Vancouver/programming/python/scripts/hn-regex_test.py
+    * /mnt/Vancouver/programming/python/scripts/hn-postprocess_bench.py
+
+multiple_replace(dict, text) (https://stackoverflow.com/a/15175239/1904943) compiled its regex on every call.  Translator does the same
+substitutions -- each position of the text is matched against the keys in dict order, and replacement values are never substituted
+again -- but:
+
+    * it is built once per replacement table (Translator.for_table() caches them);
+    * the single-character keys (',' '"' in hn_dict) go through str.replace() (or str.translate(), if a replacement value contains
+      a single-character key), and only the multi-character keys ("\\u201c" ...) through the regex: the text is split on the
+      multi-character matches, and the pieces between them get the single-character replacements.
+      (If a single-character key is also the first character of a multi-character key, the dict order decides which one matches,
+      so that table falls back to the one-regex substitution.)
+
+TranslatingWriter wraps an open file: whatever is written goes through the Translator, in blocks of complete lines, so "hn.txt" is
+postprocessed as it is written -- no read-back / rewrite pass.
+
+Story writers (FORMATS; open_output(path, format)) take the story records (dicts) one at a time, plus section headings:
+
+    * 'text'  : the hn.txt layout: json.dumps(record, indent=2) per story, through the Translator (hn_dict); "=====" section banners
+    * 'jsonl' : one JSON object per line (JSON Lines), with a "section" key
+    * 'csv'   : header row, then one row per story, with a "section" column
+    * 'html'  : a mail-ready HTML page: a list of links per section
+
+open_output() writes to a temporary file next to the output file (64 KB write buffer) and renames it over the output file only once
+everything is written (os.replace: atomic), so e.g. the hncat alias never sees a half-written file.  path None or '-' : stdout.
+
+patch_scores(path, format, scores, translator) updates just the values (votes / comments / age) of the records whose values changed, in
+an existing 'text' (raw, or postprocessed: pass the translator it was written with) or 'jsonl' output file -- each patched line comes
+out as the writer would have written it -- and replaces the file atomically: no writer, no Translator pass over the file.  The 'csv'
+and 'html' outputs are not patched (None: write them in full).
+
+read_snapshot(text) reads the records of a 'text' snapshot back -- raw (before postprocessing: "title": "...",) or postprocessed
+(title: ...); e.g. hn.2020.05.03.raw.txt, hn.2020.05.03.postprocessed.txt.  Section banners and other lines between the { ... }
+blocks are skipped.
+==============================================================================
+"""
+
+import csv
+import html
+import json
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+
+# ----------------------------------------------------------------------------
+## TRANSLATOR:
+## -----------
+
+class Translator:
+
+    _cache = {}
+
+    def __init__(self, table):
+        self.table = dict(table)
+        single = {k: v for k, v in self.table.items() if len(k) == 1}
+        multi = [k for k in self.table if len(k) > 1]
+        self._charmap = self._replacements = None
+        if any(k[0] in single for k in multi):
+            ## the keys' order matters (see the notes at the top of this file): one regex for all keys
+            self._regex = re.compile('|'.join(map(re.escape, self.table)))
+            return
+        self._regex = re.compile('(' + '|'.join(map(re.escape, multi)) + ')') if multi else None
+        if any(ch in v for v in single.values() for ch in single):
+            self._charmap = str.maketrans(single)
+        else:
+            ## no replacement value contains a single-character key, so chained str.replace() calls are equivalent -- and much
+            ## faster than str.translate() with a dict (which deletes / expands characters one at a time):
+            self._replacements = list(single.items())
+
+    @classmethod
+    def for_table(cls, table):
+        """ The Translator for this replacement table (compiled once; cached). """
+        key = tuple(table.items())
+        translator = cls._cache.get(key)
+        if translator is None:
+            translator = cls._cache[key] = cls(table)
+        return translator
+
+    def _single(self, text):
+        if self._replacements is not None:
+            for k, v in self._replacements:
+                text = text.replace(k, v)
+            return text
+        return text.translate(self._charmap)
+
+    def __call__(self, text):
+        table = self.table
+        if self._charmap is None and self._replacements is None:
+            return self._regex.sub(lambda mo: table[mo.group()], text)
+        if self._regex is None:
+            return self._single(text)
+        ## split() with a capturing group: [text, key, text, key, ..., text]
+        parts = self._regex.split(text)
+        for i in range(0, len(parts), 2):
+            parts[i] = self._single(parts[i])
+        for i in range(1, len(parts), 2):
+            parts[i] = table[parts[i]]
+        return ''.join(parts)
+
+
+def multiple_replace(dict, text):
+    """ Replace each key of dict found in text by its value (a single pass; see Translator). """
+    return Translator.for_table(dict)(text)
+
+# ----------------------------------------------------------------------------
+## STREAMING:
+## ----------
+
+class TranslatingWriter:
+    """ File-like: the text written passes through the Translator on its way to f, in blocks of complete lines (~buffer_size).
+
+        (The keys may not contain a newline, so a block of complete lines never splits a key.)
+    """
+
+    def __init__(self, f, translator, buffer_size=64 * 1024):
+        if any('\n' in k for k in translator.table):
+            raise ValueError('TranslatingWriter: replacement keys may not contain a newline')
+        self.f = f
+        self.translator = translator
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._size = 0
+
+    def write(self, text):
+        n = len(text)
+        self._buffer.append(text)
+        self._size += n
+        if self._size >= self.buffer_size:
+            text = ''.join(self._buffer)
+            cut = text.rfind('\n') + 1
+            self.f.write(self.translator(text[:cut]))
+            self._buffer = [text[cut:]]
+            self._size = len(text) - cut
+        return n
+
+    def flush(self):
+        if self._size:
+            self.f.write(self.translator(''.join(self._buffer)))
+            self._buffer = []
+            self._size = 0
+        self.f.flush()
+
+# ----------------------------------------------------------------------------
+## STORY WRITERS:
+## --------------
+
+class StoryWriter:
+    """ Base class: begin(), then write(record) / section(title) in any order, then end(). """
+
+    def __init__(self, f):
+        self.f = f
+        self.current_section = ''
+
+    def begin(self):
+        pass
+
+    def section(self, title):
+        self.current_section = title
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def end(self):
+        self.f.flush()
+
+
+class TextWriter(StoryWriter):
+    """ The hn.txt layout (postprocessed by the translator, if given). """
+
+    def __init__(self, f, translator=None):
+        super().__init__(TranslatingWriter(f, translator) if translator is not None else f)
+
+    def section(self, title):
+        super().section(title)
+        rule = '=' * 78
+        self.f.write('\n{}\n{}\n{}\n\n'.format(rule, title, rule))
+
+    def write(self, record):
+        self.f.write(json.dumps(record, indent=2) + '\n')
+
+
+class JsonLinesWriter(StoryWriter):
+
+    def write(self, record):
+        self.f.write(json.dumps(dict(record, section=self.current_section)) + '\n')
+
+
+class CsvWriter(StoryWriter):
+
+    def __init__(self, f):
+        super().__init__(f)
+        self._csv = None
+
+    def write(self, record):
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.f, fieldnames=['section'] + list(record))
+            self._csv.writeheader()
+        row = {k: '\n'.join(v) if isinstance(v, list) else v for k, v in record.items()}
+        self._csv.writerow(dict(row, section=self.current_section))
+
+
+class HtmlWriter(StoryWriter):
+
+    def __init__(self, f):
+        super().__init__(f)
+        self._open_list = False
+
+    def begin(self):
+        self.f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Hacker News</title></head>\n<body>\n')
+
+    def _close_list(self):
+        if self._open_list:
+            self.f.write('</ul>\n')
+            self._open_list = False
+
+    def section(self, title):
+        super().section(title)
+        self._close_list()
+        self.f.write('<h3>{}</h3>\n'.format(html.escape(title)))
+
+    def write(self, record):
+        if not self._open_list:
+            self.f.write('<ul>\n')
+            self._open_list = True
+        age = record['age (h)']
+        age = '{:.1f} h'.format(age) if isinstance(age, (int, float)) else html.escape(str(age))
+        self.f.write('<li><a href="{}">{}</a><br>{} points | <a href="{}">{} comments</a> | {}'.format(
+            html.escape(record['ext_link'] or record['hn_url']), html.escape(record['title']),
+            record['votes'], html.escape(record['hn_url']), record['comments'], age))
+        if record.get('top comments'):
+            self.f.write('<ul>{}</ul>'.format(''.join('<li>{}</li>'.format(html.escape(c)) for c in record['top comments'])))
+        self.f.write('</li>\n')
+
+    def end(self):
+        self._close_list()
+        self.f.write('</body></html>\n')
+        super().end()
+
+
+FORMATS = {'text': TextWriter, 'jsonl': JsonLinesWriter, 'csv': CsvWriter, 'html': HtmlWriter}
+
+
+@contextmanager
+def open_output(path, format='text', translator=None):
+    """ A story writer (FORMATS) to path -- replaced atomically once the with block completes -- or to stdout (path None or '-'). """
+    if format not in FORMATS:
+        raise ValueError('unknown output format: {!r} (use one of {})'.format(format, ', '.join(FORMATS)))
+
+    def writer(f):
+        return FORMATS[format](f, translator) if format == 'text' else FORMATS[format](f)
+
+    if path is None or path == '-':
+        out = writer(sys.stdout)
+        out.begin()
+        yield out
+        out.end()
+        return
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with open(fd, 'w', buffering=64 * 1024, newline='' if format == 'csv' else None) as f:
+            out = writer(f)
+            out.begin()
+            yield out
+            out.end()
+        ## mkstemp() files are private (0600); the output file is for reading:
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def replace_file(path, text):
+    """ Write text to path atomically (temporary file, then os.replace). """
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with open(fd, 'w', newline='') as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+# ----------------------------------------------------------------------------
+## SCORE PATCHES:
+## --------------
+
+## a record's own lines (indent 2; list items are indented further): '  votes: 157'  |  '  "comments": "80",'  |  '  "age (h)": 18'
+SCORE_LINE_RE = re.compile(r'^(  "?)([^":\s][^":]*?)("?: )(.*?)(,?)$')
+PATCH_FORMATS = ('text', 'jsonl')
+
+
+def patch_scores(path, format, scores, translator=None):
+    """ Update values (votes, comments, ...) of the records in an output file; scores: {hn_url: {key: value}}, the values as in the
+        records written (the 'text' lines are made as TextWriter makes them, through translator).
+
+        Returns the number of records changed (0: the file is left alone), or None if this format can not be patched.
+    """
+    if format not in PATCH_FORMATS:
+        return None
+    with open(path, 'r', newline='') as f:
+        lines = f.read().splitlines(keepends=True)
+    patched = set()
+    if format == 'jsonl':
+        for i, line in enumerate(lines):
+            record = json.loads(line)
+            values = scores.get(record.get('hn_url'), {})
+            if any(record.get(key) != value for key, value in values.items()):
+                record.update(values)
+                lines[i] = json.dumps(record) + '\n'
+                patched.add(record['hn_url'])
+    else:
+        ## records are written title, hn_url, ext_link, votes, comments, ...: the value lines after each hn_url line
+        url = values = None
+        for i, line in enumerate(lines):
+            text = line.rstrip('\r\n')
+            m = SCORE_LINE_RE.match(text)
+            if m is None:
+                continue
+            key = m.group(2)
+            if key == 'hn_url':
+                url = snapshot_value(key, m.group(4))
+                values = scores.get(url)
+            elif values is not None and key in values:
+                value = json.dumps(values[key])
+                if translator is not None:
+                    value = translator(value)
+                new_line = m.group(1) + key + m.group(3) + value + m.group(5) + line[len(text):]
+                if new_line != line:
+                    lines[i] = new_line
+                    patched.add(url)
+    if patched:
+        replace_file(path, ''.join(lines))
+    return len(patched)
+
+# ----------------------------------------------------------------------------
+## SNAPSHOTS:
+## ----------
+
+## "title": "Jetson AGX Xavier",  |  title: Jetson AGX Xavier  |  "age (h)": 18,
+SNAPSHOT_LINE_RE = re.compile(r'^\s*"?([^":]+?)"?\s*:\s?(.*)$')
+SNAPSHOT_NUMBERS = {'votes': int, 'comments': int, 'age (h)': float}
+
+
+def snapshot_value(key, value):
+    value = value.rstrip()
+    if value.endswith(','):
+        value = value[:-1]
+    if value.startswith('"') and value.endswith('"') and len(value) > 1:
+        ## raw (JSON) string:
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value[1:-1]
+    if key in SNAPSHOT_NUMBERS:
+        try:
+            number = SNAPSHOT_NUMBERS[key](value)
+            return int(number) if key == 'age (h)' and number == int(number) else number
+        except ValueError:
+            return value
+    return value
+
+
+def read_snapshot(text):
+    """ The story records (dicts) of a 'text' snapshot (raw or postprocessed), in file order. """
+    records = []
+    record = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped == '{':
+            record = {}
+        elif stripped == '}':
+            if record:
+                records.append(record)
+            record = None
+        elif record is not None:
+            m = SNAPSHOT_LINE_RE.match(line)
+            if m:
+                record[m.group(1)] = snapshot_value(m.group(1), m.group(2))
+    return records
+
+# ============================================================================
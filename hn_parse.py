@@ -0,0 +1,286 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_parse.py
+        about: story extraction for the Hacker News scraper (hn.py): walks the 'athing' / 'subtext' row pairs once
+        title: Hacker News Scraper parser
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 03
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : single-pass extractor (replaces the per-item soup.select('td.subtext') rescans in hn.py)
+    * v02 : parser backends: 'html.parser' | 'lxml' | 'stream' (zero-DOM html.parser.HTMLParser tokenizer); parse_stories()
+    * v03 : parse_subtext(): one precompiled pass over the subtext text for points, comments ("discuss" = 0) and age; per-field failures
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py               ## << uses iter_stories()
+    * /mnt/Vancouver/programming/python/scripts/hn-parse_bench.py   ## << benchmark (synthetic pages)
+    * /mnt/Vancouver/programming/python/scripts/hn-subtext_bench.py ## << parse_subtext(): fuzz check + benchmark (generated subtext strings)
+
+Each front-page story is two <tr> rows (see SAMPLE SOURCE HTML in hn.py):
+
+    <tr class='athing' id='22897846'> ... <a href="..." class="storylink">title</a> ... </tr>
+    <tr> ... <td class="subtext"> <span class="score">77 points</span> ... <span class="age">...</span> ... 24&nbsp;comments </td> </tr>
+
+iter_stories() visits each 'athing' row once and takes its subtext row from the very next <tr>, so the cost is linear in the page size.
+
+Parser backends (parse_stories(html, backend=...)); all three return identical Story records:
+
+    * 'html.parser' : BeautifulSoup tree (pure Python) + iter_stories()
+    * 'lxml'        : lxml.html tree (C); optional dependency, imported on use
+    * 'stream'      : no tree at all -- StoryStreamParser keeps only the athing / storylink / subtext fields as the tokenizer goes by;
+                      also accepts the page in chunks (iter_stories_stream)
+==============================================================================
+"""
+
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+# ----------------------------------------------------------------------------
+## STORY RECORD:
+## -------------
+
+## id : HN item id (str) | points, comments : int (None if absent: job posts) | age : e.g. '3 hours ago'
+Story = namedtuple('Story', ['id', 'title', 'href', 'points', 'comments', 'age'])
+
+# ----------------------------------------------------------------------------
+## SUBTEXT TOKENIZER:
+## ------------------
+
+## 107 points by pcr910303 2 hours ago | hide | 52 comments
+## One precompiled regex, one left-to-right pass (findall) over the subtext text: "<number> <word>" tokens and "discuss"; each token
+## fills only its own field.  (The (?=[\dd]) lookahead lets the regex engine skip ahead to the next digit or 'd'.)
+SUBTEXT_RE = re.compile(r'(?=[\dd])(?:(\d+)\s+(point|comment|minute|hour|day|month|year)s?\b|\bdiscuss\b)')
+
+## points, comments : int | age : int, in age_unit ('minute' | 'hour' | 'day' | 'month' | 'year'); each None if its token is absent
+Subtext = namedtuple('Subtext', ['points', 'comments', 'age', 'age_unit'])
+
+
+def parse_subtext(text):
+    """ '77 points by pseudolus 3 hours ago | hide | 24 comments' --> Subtext(77, 24, 3, 'hour').
+
+        A field whose token is missing or malformed is None on its own: a job post ('3 hours ago') is Subtext(None, None, 3, 'hour');
+        "discuss" (no comments yet) is 0 comments.  Points and age are the first of their tokens; comments the last (the comments link
+        ends the subtext, after the user name -- which could be 'discuss').
+    """
+    points = comments = age = unit = None
+    for n, word in SUBTEXT_RE.findall(text or ''):
+        if word == 'point':
+            if points is None:
+                points = int(n)
+        elif word == 'comment':
+            comments = int(n)
+        elif not word:
+            comments = 0
+        elif age is None:
+            age, unit = int(n), word
+    return Subtext(points, comments, age, unit)
+
+# ----------------------------------------------------------------------------
+## EXTRACTOR:
+## ----------
+
+def iter_stories(soup):
+    """ Yield a Story for each 'athing' row of a BeautifulSoup document, in page order (single pass). """
+    for athing in soup.find_all('tr', class_='athing'):
+        link = athing.find('a', class_='storylink')
+        ## the subtext row is the next <tr> sibling of the 'athing' row:
+        row = athing.find_next_sibling('tr')
+        subtext = row.find('td', class_='subtext') if row is not None else None
+        if link is None or subtext is None:
+            continue
+        fields = parse_subtext(subtext.get_text())
+        age = subtext.find('span', class_='age')
+        yield Story(id=athing.get('id'),
+                    title=link.get_text(),
+                    href=link.get('href', None),
+                    points=fields.points,
+                    comments=fields.comments,
+                    age=age.get_text() if age is not None else '')
+
+# ----------------------------------------------------------------------------
+## LXML BACKEND:
+## -------------
+
+def _has_class(cls, name):
+    return name in (cls or '').split()
+
+
+def iter_stories_lxml(tree):
+    """ Yield a Story for each 'athing' row of an lxml.html document (same fields as iter_stories()). """
+    for athing in tree.iter('tr'):
+        if not _has_class(athing.get('class'), 'athing'):
+            continue
+        link = next((a for a in athing.iter('a') if _has_class(a.get('class'), 'storylink')), None)
+        row = athing.getnext()
+        while row is not None and row.tag != 'tr':
+            row = row.getnext()
+        subtext = None
+        if row is not None:
+            subtext = next((td for td in row.iter('td') if _has_class(td.get('class'), 'subtext')), None)
+        if link is None or subtext is None:
+            continue
+        fields = parse_subtext(subtext.text_content())
+        age = next((span for span in subtext.iter('span') if _has_class(span.get('class'), 'age')), None)
+        yield Story(id=athing.get('id'),
+                    title=link.text_content(),
+                    href=link.get('href', None),
+                    points=fields.points,
+                    comments=fields.comments,
+                    age=age.text_content() if age is not None else '')
+
+# ----------------------------------------------------------------------------
+## STREAM BACKEND (zero-DOM):
+## --------------------------
+
+class StoryStreamParser(HTMLParser):
+    """ html.parser.HTMLParser callbacks that keep only the story fields; completed Story records collect in self.stories.
+
+        feed() may be called with any chunking of the page; pop_stories() drains what has been completed so far.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stories = []
+        self._row = None         # fields of the current story (from its 'athing' row on)
+        self._capture = None     # field the text data is going to: 'title' | 'age' | None
+        self._in_subtext = False
+
+    def pop_stories(self):
+        stories, self.stories = self.stories, []
+        return stories
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            attrs = dict(attrs)
+            if _has_class(attrs.get('class'), 'athing'):
+                self._row = {'id': attrs.get('id'), 'title': None, 'href': None, 'age': None, 'subtext': [], 'next_tr': False}
+            elif self._row is not None:
+                if self._row['title'] is None or self._row['next_tr']:
+                    ## 'athing' row without a storylink, or the next <tr> had no subtext:
+                    self._row = None
+                else:
+                    self._row['next_tr'] = True
+        elif self._row is None:
+            return
+        elif tag == 'a' and self._row['title'] is None and not self._in_subtext:
+            attrs = dict(attrs)
+            if _has_class(attrs.get('class'), 'storylink'):
+                self._row['title'] = []
+                self._row['href'] = attrs.get('href', None)
+                self._capture = 'title'
+        elif tag == 'td' and self._row['next_tr'] and _has_class(dict(attrs).get('class'), 'subtext'):
+            self._in_subtext = True
+        elif tag == 'span' and self._in_subtext and self._row['age'] is None and _has_class(dict(attrs).get('class'), 'age'):
+            self._row['age'] = []
+            self._capture = 'age'
+
+    def handle_endtag(self, tag):
+        if self._row is None:
+            return
+        if tag == 'a' and self._capture == 'title':
+            self._capture = None
+        elif tag == 'span' and self._capture == 'age':
+            self._capture = None
+        elif tag == 'td' and self._in_subtext:
+            row = self._row
+            fields = parse_subtext(''.join(row['subtext']))
+            self.stories.append(Story(id=row['id'],
+                                      title=''.join(row['title']),
+                                      href=row['href'],
+                                      points=fields.points,
+                                      comments=fields.comments,
+                                      age=''.join(row['age']) if row['age'] is not None else ''))
+            self._row = None
+            self._capture = None
+            self._in_subtext = False
+
+    def handle_data(self, data):
+        if self._row is None:
+            return
+        if self._capture is not None:
+            self._row[self._capture].append(data)
+        if self._in_subtext:
+            self._row['subtext'].append(data)
+
+
+def iter_stories_stream(chunks):
+    """ Yield Story records from an iterable of HTML text chunks (e.g. requests' iter_content(decode_unicode=True)) as they complete. """
+    parser = StoryStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.pop_stories()
+    parser.close()
+    yield from parser.pop_stories()
+
+# ----------------------------------------------------------------------------
+## BACKEND SELECTION:
+## ------------------
+
+BACKENDS = ('html.parser', 'lxml', 'stream')
+
+
+def parse_stories(html, backend='html.parser'):
+    """ Return the list of Story records in an HN listing page, using the given parser backend (see BACKENDS). """
+    if backend == 'html.parser':
+        from bs4 import BeautifulSoup
+        return list(iter_stories(BeautifulSoup(html, 'html.parser')))
+    elif backend == 'lxml':
+        import lxml.html
+        return list(iter_stories_lxml(lxml.html.fromstring(html)))
+    elif backend == 'stream':
+        return list(iter_stories_stream([html]))
+    raise ValueError('unknown parser backend: {!r} (use one of {})'.format(backend, ', '.join(BACKENDS)))
+
+# ----------------------------------------------------------------------------
+## SYNTHETIC PAGES (benchmarks):
+## -----------------------------
+
+## Same markup as the SAMPLE SOURCE HTML in hn.py:
+SAMPLE_ROWS = """
+<tr class='athing' id='{id}'>
+    <td align="right" valign="top" class="title"><span class="rank">{rank}.</span></td>
+    <td valign="top" class="votelinks"><center><a id='up_{id}' onclick='return vote(event, this, "up")' href='vote?id={id}&amp;how=up&amp;goto=news'><div class='votearrow' title='upvote'></div></a></center></td>
+    <td class="title"><a href="{href}" class="storylink">{title}</a><span class="sitebit comhead"> (<a href="from?site={site}"> <span class="sitestr">{site}</span></a>) </span></td>
+</tr>
+<tr>
+    <td colspan="2"></td>
+    <td class="subtext">
+        <span class="score" id="score_{id}">{points} points</span> by <a href="user?id={user}" class="hnuser">{user}</a>
+        <span class="age"><a href="item?id={id}">{age}</a></span>
+        <span id="unv_{id}"></span> | <a href="flag?id={id}&amp;goto=news">flag</a> | <a href="hide?id={id}&amp;goto=news" onclick="return hidestory(event, this, {id})">hide</a> | <a href="item?id={id}">{comments}&nbsp;comments</a>
+    </td>
+</tr>
+<tr class="spacer" style="height:5px"></tr>
+"""
+
+SAMPLE_PAGE = """<html><head><title>Hacker News</title></head><body><center><table id="hnmain"><tr><td><table class="itemlist">
+{rows}
+</table></td></tr></table></center></body></html>
+"""
+
+
+def synthetic_page(n_rows, first_id=22897846):
+    """ Return a front-page-like HTML document with n_rows stories. """
+    ages = ['{} minutes ago', '{} hours ago', '{} days ago']
+    rows = []
+    for i in range(n_rows):
+        rows.append(SAMPLE_ROWS.format(id=first_id + i,
+                                       rank=i + 1,
+                                       href='https://example{}.com/story/{}'.format(i % 97, i),
+                                       title='Synthetic story number {}'.format(i),
+                                       site='example{}.com'.format(i % 97),
+                                       points=(i * 7) % 500,
+                                       user='user{}'.format(i % 13),
+                                       age=ages[i % 3].format(i % 23 + 1),
+                                       comments=(i * 3) % 200))
+    return SAMPLE_PAGE.format(rows=''.join(rows))
+
+# ============================================================================
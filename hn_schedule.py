@@ -0,0 +1,244 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_schedule.py
+        about: polite fetching for hn.py: token-bucket rate limit, per-request deadlines, retries with backoff + jitter, circuit breaker
+        title: Hacker News Scraper fetch scheduler
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 01
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : FetchScheduler (TokenBucket per host, CircuitBreaker per host, retries: exponential backoff with full jitter, Retry-After)
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py                 ## << fetch_* / breaker_* settings; a degraded site keeps the last hn.txt
+    * /mnt/Vancouver/programming/python/scripts/hn_fetch.py           ## << crawl(..., scheduler=...)
+    * /mnt/Vancouver/programming/python/scripts/hn_standin.py         ## << fault injection (503 / 429 + Retry-After, hang, reset, empty page)
+    * /mnt/Vancouver/programming/python/scripts/hn-schedule_bench.py  ## << the scheduler against the fault-injecting stand-in
+
+FetchScheduler.get(session, url) makes one logical request -- a few attempts at most -- within a per-request deadline:
+
+    * rate limit  : a token bucket per host (rate tokens / s, up to burst saved up); every attempt, retries included, takes a token.
+                    Concurrent crawl workers share the buckets, so the limit holds however many pages are in flight.
+    * timeouts    : each attempt gets (connect, read) timeouts, cut down to what is left of the deadline; a hung connection costs one
+                    read timeout, not the whole run.  (A read timeout bounds each wait for data, not the whole body.)
+    * retries     : connection errors, timeouts and 429 / 5xx answers are retried, after an exponential backoff with full jitter
+                    (uniform 0 .. backoff * 2**attempt, capped at max_backoff) -- or after what the Retry-After header asks, if it says.
+                    If the wait does not fit in the deadline, the request fails now.  Other answers (200, 304, 404, ...) are returned.
+    * breaker     : a circuit breaker per host counts failed attempts in a row; at `failures` it opens, and for `reset` seconds every
+                    request to that host fails at once (CircuitOpen) without touching the network.  Then one trial request is let
+                    through (half-open): a success closes the breaker, a failure opens it again.
+
+A request that cannot succeed raises FetchError (hn_fetch.py); hn.py then leaves the last output as it is.
+==============================================================================
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from hn_fetch import FetchError
+from hn_metrics import NULL_METRICS
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class CircuitOpen(FetchError):
+    """ The host's circuit breaker is open: no request was made. """
+
+# ----------------------------------------------------------------------------
+## RATE LIMIT:
+## -----------
+
+class TokenBucket:
+    """ rate tokens per second, at most burst of them saved up; thread-safe. """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, limit=None):
+        """ Take a token: seconds to wait before using it (0: now); None (nothing taken) if that would be more than limit seconds. """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if limit is not None and wait > limit:
+                return None
+            ## a reserved token may leave the bucket in debt: the next caller waits for it to refill
+            self._tokens -= 1
+            return wait
+
+    def acquire(self, limit=None):
+        """ Wait for a token; False (nothing taken) if that would take more than limit seconds. """
+        wait = self.reserve(limit)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+# ----------------------------------------------------------------------------
+## CIRCUIT BREAKER:
+## ----------------
+
+class CircuitBreaker:
+    """ closed --> (failures in a row) --> open --> (reset s) --> half-open: one trial request --> closed | open. """
+
+    def __init__(self, failures=5, reset=600.0):
+        self.failures = failures
+        self.reset = reset
+        self.failed = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset else 'open'
+
+    def allow(self):
+        """ May a request go out now?  (In the half-open state, only one at a time: the trial.) """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def cancel(self):
+        """ An allowed request that was not made after all: the trial (if it was one) is free again. """
+        with self._lock:
+            self._trial = False
+
+    def success(self):
+        with self._lock:
+            self.failed = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self):
+        """ Returns True if this failure opened the breaker. """
+        with self._lock:
+            self.failed += 1
+            trial, self._trial = self._trial, False
+            if trial or (self.opened_at is None and self.failed >= self.failures):
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+# ----------------------------------------------------------------------------
+## SCHEDULER:
+## ----------
+
+def retry_after(res):
+    """ The Retry-After header in seconds (delta-seconds or an HTTP date); None if absent or unreadable. """
+    value = res.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class FetchScheduler:
+    """ Rate-limited, deadline-bounded, retrying GET with a circuit breaker per host (see the notes at the top of this file). """
+
+    def __init__(self, rate=1.0, burst=4, timeout=(5, 20), deadline=120.0, retries=3, backoff=2.0, max_backoff=60.0, failures=5, reset=600.0):
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failures = failures
+        self.reset = reset
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._breakers = {}
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def breaker(self, host):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failures, self.reset)
+            return self._breakers[host]
+
+    def backoff_wait(self, attempt):
+        """ Full jitter: uniform over 0 .. backoff * 2**attempt (capped). """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def attempt_timeout(self, remaining):
+        connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        return (min(connect, remaining), min(read, remaining))
+
+    def get(self, session, url, headers=None, metrics=NULL_METRICS):
+        """ session.get(url) within the deadline: the response (any status but 429 / 5xx), or FetchError. """
+        host = urlsplit(url).netloc
+        bucket, breaker = self.bucket(host), self.breaker(host)
+        give_up = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                metrics.count('fetch_breaker_open')
+                raise CircuitOpen('{}: circuit breaker open ({} failed attempts in a row); not retrying for {:.0f} s'.format(
+                    url, breaker.failed, self.reset))
+            if not bucket.acquire(limit=give_up - time.monotonic()):
+                breaker.cancel()
+                raise FetchError('{}: rate limit: no request slot within the {:.0f} s deadline'.format(url, self.deadline))
+            try:
+                res = session.get(url, headers=headers, timeout=self.attempt_timeout(max(give_up - time.monotonic(), 0.001)))
+            except requests.RequestException as e:
+                error, wait = e, None
+            else:
+                if res.status_code not in RETRY_STATUSES:
+                    breaker.success()
+                    return res
+                error, wait = 'HTTP {}'.format(res.status_code), retry_after(res)
+            metrics.count('fetch_failed_attempts')
+            attempt += 1
+            if breaker.failure():
+                metrics.count('fetch_breaker_opened')
+                raise CircuitOpen('{}: {}; circuit breaker opened ({} failed attempts in a row)'.format(url, error, breaker.failed))
+            if wait is None:
+                wait = self.backoff_wait(attempt - 1)
+            if attempt > self.retries:
+                raise FetchError('{}: {} (gave up after {} attempts)'.format(url, error, attempt))
+            if time.monotonic() + wait >= give_up:
+                raise FetchError('{}: {}; a retry in {:.1f} s would pass the {:.0f} s deadline'.format(url, error, wait, self.deadline))
+            metrics.count('fetch_retries')
+            time.sleep(wait)
+
+# ============================================================================
@@ -0,0 +1,310 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_standin.py
+        about: local HTTP stand-in for news.ycombinator.com: serves saved (or synthetic) listing pages to hn.py / hn_fetch.py
+        title: Hacker News Scraper HTTP stand-in
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 05
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : saved pages directory or synthetic pages; per-request delay (simulated network latency)
+    * v02 : ETag on every page; If-None-Match --> 304 Not Modified (conditional GET); server.hits counts requests per path
+    * v03 : ReplaySession (in-process fetch stub: no sockets); snapshot_page() (front page HTML from hn.txt snapshot records)
+    * v04 : Firebase API items (/v0/item/<id>.json): saved, or synthetic comment threads (hn_comments.py)
+    * v05 : fault injection (start(..., faults=...); --faults): HTTP errors with Retry-After, hung and reset connections, empty pages
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn_fetch.py
+    * /mnt/Vancouver/programming/python/scripts/hn_comments.py
+    * /mnt/Vancouver/programming/python/scripts/hn-crawl_bench.py
+    * /mnt/Vancouver/programming/python/scripts/hn-schedule_bench.py   ## << hn_schedule.FetchScheduler against injected faults
+
+Usage:
+    * python /mnt/Vancouver/programming/python/scripts/hn_standin.py [--port 8000] [--pages-dir DIR] [--delay 0.25] [--faults 503:2,hang,ok,...]
+
+      ... then point hn.py at it: hn_site_url = 'http://127.0.0.1:8000/'; hn_api_url = 'http://127.0.0.1:8000/v0/'
+
+    Saved pages: DIR/<endpoint>.html (page 1) and DIR/<endpoint>.<p>.html (news?p=2 --> DIR/news.2.html).
+    Without --pages-dir, every /<endpoint>?p=N is answered with a synthetic 30-story page (hn_parse.synthetic_page); 'news' and 'best'
+    share their item ids, so a crawl over both exercises the dedupe.
+
+    API items: /v0/item/<id>.json --> DIR/item/<id>.json, or null (as Firebase answers an unknown id).  Without --pages-dir, every story
+    id has a synthetic comment thread (synthetic_item()): (id % 60) comments, THREAD_FANOUT replies per comment, every 7th one deleted;
+    comment ids are <story id> * 1000 + <n>.
+
+    Faults: server.faults is a queue of faults, one taken per request (then the requests are answered normally again):
+
+        '503', '429', ... : that HTTP status, with a short error body; '503:2' : ... and 'Retry-After: 2'
+        'hang'            : no answer for server.hang s (HANG_SECONDS), then the connection is closed -- a client without a read
+                            timeout hangs that long
+        'reset'           : the connection is closed without an answer
+        'empty'           : 200 with HN's "Sorry, we're not able to serve your requests this quickly." page (no stories)
+        'ok'              : a normal answer (e.g. 'ok,503' : the second request fails)
+
+    server.inject(faults) queues more (a list, or a comma-separated string).
+
+    ReplaySession: drop-in for the requests.Session passed to hn_fetch.crawl(), answering from a dict of saved pages in-process (for
+    benchmarks that should time the pipeline, not the loopback network).  snapshot_page(records) renders hn.txt snapshot records
+    (hn_output.read_snapshot) back into front-page HTML, so the saved outputs can be replayed through the whole pipeline.
+==============================================================================
+"""
+
+import argparse
+import collections
+import hashlib
+import html
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from hn_parse import SAMPLE_PAGE, SAMPLE_ROWS, synthetic_page
+
+ROWS_PER_PAGE = 30
+HANG_SECONDS = 30
+OVERLOAD_PAGE = "<html><head></head><body>Sorry, we're not able to serve your requests this quickly.</body></html>"
+## first item id of each endpoint's synthetic listing:
+SYNTHETIC_IDS = {'news': 23000000, 'best': 23000000, 'newest': 24000000, 'ask': 25000000, 'show': 26000000}
+
+API_ITEM_PATH = '/v0/item/'
+## synthetic comment threads: replies per comment; ids from COMMENT_IDS up are comments (<story id> * 1000 + <n>):
+THREAD_FANOUT = 3
+COMMENT_IDS = 10**9
+
+
+def synthetic_thread_size(story_id):
+    return story_id % 60
+
+
+def synthetic_kids(story_id, n, size):
+    """ Ids of the replies to comment n (n = 0: the story). """
+    return [story_id * 1000 + k for k in range(n * THREAD_FANOUT, (n + 1) * THREAD_FANOUT) if 1 <= k <= size]
+
+
+def synthetic_item(item_id):
+    """ The synthetic API item (dict) for item_id: a story with a comment thread, or one of its comments; None if there is no such item. """
+    if item_id < COMMENT_IDS:
+        size = synthetic_thread_size(item_id)
+        return {'id': item_id, 'type': 'story', 'by': 'user{}'.format(item_id % 13), 'title': 'Synthetic story {}'.format(item_id),
+                'score': item_id % 500, 'descendants': size, 'kids': synthetic_kids(item_id, 0, size), 'time': 1588510800}
+    story_id, n = divmod(item_id, 1000)
+    size = synthetic_thread_size(story_id)
+    if story_id >= COMMENT_IDS or not 1 <= n <= size:
+        return None
+    parent = story_id if n < THREAD_FANOUT else story_id * 1000 + n // THREAD_FANOUT
+    item = {'id': item_id, 'type': 'comment', 'parent': parent, 'kids': synthetic_kids(story_id, n, size), 'time': 1588510800 + n}
+    if n % 7 == 0:
+        item['deleted'] = True
+    else:
+        item.update(by='user{}'.format(n % 13), text='Comment {} on story {}: &quot;synthetic&quot;<p>Second paragraph.'.format(n, story_id))
+    return item
+
+
+# ----------------------------------------------------------------------------
+## HTTP STAND-IN:
+## --------------
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    ## the default listen backlog (5) makes a burst of concurrent connections wait out a SYN retry:
+    request_queue_size = 128
+
+    def inject(self, faults):
+        """ Queue faults (see the notes at the top of this file): a list, or a comma-separated string. """
+        if isinstance(faults, str):
+            faults = [fault.strip() for fault in faults.split(',') if fault.strip()]
+        with self.faults_lock:
+            self.faults.extend(faults)
+
+    def next_fault(self):
+        with self.faults_lock:
+            return self.faults.popleft() if self.faults else None
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    ## set on the server: pages_dir (str or None), delay (s), faults, hang (s)
+    ## this request got the 'empty' fault:
+    overload = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.hits[self.path] += 1
+        fault = self.server.next_fault()
+        if fault not in (None, 'ok') and self.inject(fault):
+            return
+        if url.path.startswith(API_ITEM_PATH):
+            body, content_type = self.api_item(url.path[len(API_ITEM_PATH):]), 'application/json'
+        else:
+            endpoint = url.path.strip('/') or 'news'
+            p = int(parse_qs(url.query).get('p', ['1'])[0])
+            body, content_type = self.page(endpoint, p), 'text/html; charset=utf-8'
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if body is None:
+            self.send_error(404)
+            return
+        body = body.encode('utf-8')
+        etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def inject(self, fault):
+        """ Answer with the fault; False if it is 'empty' (the page is then OVERLOAD_PAGE, served as usual). """
+        self.server.faults_injected[fault] += 1
+        if fault == 'empty':
+            self.overload = True
+            return False
+        self.close_connection = True
+        if fault == 'hang':
+            time.sleep(self.server.hang)
+        elif fault == 'reset':
+            pass
+        else:
+            status, _, after = fault.partition(':')
+            self.send_response(int(status))
+            if after:
+                self.send_header('Retry-After', after)
+            body = '{} {}'.format(status, self.responses.get(int(status), ('',))[0]).encode('utf-8')
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        return True
+
+    def page(self, endpoint, p):
+        if self.overload:
+            return OVERLOAD_PAGE
+        if self.server.pages_dir is not None:
+            name = '{}.html'.format(endpoint) if p == 1 else '{}.{}.html'.format(endpoint, p)
+            path = os.path.join(self.server.pages_dir, name)
+            if not os.path.isfile(path):
+                return None
+            with open(path, 'r') as f:
+                return f.read()
+        if endpoint not in SYNTHETIC_IDS:
+            return None
+        return synthetic_page(ROWS_PER_PAGE, first_id=SYNTHETIC_IDS[endpoint] + (p - 1) * ROWS_PER_PAGE)
+
+    def api_item(self, name):
+        if not name.endswith('.json') or not name[:-5].isdigit():
+            return None
+        if self.server.pages_dir is not None:
+            path = os.path.join(self.server.pages_dir, 'item', name)
+            if not os.path.isfile(path):
+                return 'null'
+            with open(path, 'r') as f:
+                return f.read()
+        return json.dumps(synthetic_item(int(name[:-5])))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port=0, pages_dir=None, delay=0.0, faults=(), hang=HANG_SECONDS):
+    """ Serve in a background (daemon) thread; returns (server, base_url).  server.shutdown() to stop. """
+    server = StandinServer(('127.0.0.1', port), StandinHandler)
+    server.pages_dir = pages_dir
+    server.delay = delay
+    server.hits = collections.Counter()
+    server.faults = collections.deque()
+    server.faults_lock = threading.Lock()
+    server.faults_injected = collections.Counter()
+    server.hang = hang
+    server.inject(faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://127.0.0.1:{}/'.format(server.server_address[1])
+
+
+# ----------------------------------------------------------------------------
+## IN-PROCESS REPLAY:
+## ------------------
+
+class ReplayResponse:
+
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = headers or {}
+
+
+class ReplaySession:
+    """ get(url) answered from pages: {'news': html, 'news?p=2': html, ...} (keys relative to base_url); 404 otherwise. """
+
+    def __init__(self, pages, base_url='https://news.ycombinator.com/'):
+        self.pages = pages
+        self.base_url = base_url
+        self.hits = collections.Counter()
+
+    def get(self, url, headers=None, **kwargs):
+        key = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        self.hits[key] += 1
+        if key not in self.pages:
+            return ReplayResponse(404)
+        return ReplayResponse(200, self.pages[key], {'Content-Type': 'text/html; charset=utf-8'})
+
+
+def age_text(age_h):
+    """ 'age (h)' (as computed by hn.py) back to HN's age text: 0.7833... --> '47 minutes ago', 18 --> '18 hours ago', 48.0 --> '2 days ago'. """
+    age_h = float(age_h)
+    if age_h < 1:
+        return '{} minutes ago'.format(int(round(age_h * 60)))
+    if age_h < 24 or age_h != int(age_h) or int(age_h) % 24:
+        return '{} hours ago'.format(int(age_h))
+    return '{} days ago'.format(int(age_h) // 24)
+
+
+def snapshot_page(records, id_offset=0):
+    """ Front page HTML for hn.txt snapshot records (hn_output.read_snapshot); id_offset shifts the item ids (for scaled-up copies). """
+    rows = []
+    for rank, record in enumerate(records, 1):
+        hn_id = int(record['hn_url'].rsplit('=', 1)[1]) + id_offset
+        href = record['ext_link']
+        if href.startswith('item?id='):
+            href = 'item?id={}'.format(hn_id)
+        rows.append(SAMPLE_ROWS.format(id=hn_id,
+                                       rank=rank,
+                                       href=html.escape(href),
+                                       title=html.escape(record['title'], quote=False),
+                                       site='example.com',
+                                       points=record['votes'],
+                                       user='user',
+                                       age=age_text(record['age (h)']),
+                                       comments=record['comments']))
+    return SAMPLE_PAGE.format(rows=''.join(rows))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local HTTP stand-in for news.ycombinator.com')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages-dir', default=None, help='directory of saved pages (default: synthetic pages)')
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds to wait before each response')
+    parser.add_argument('--faults', default='', help='faults for the first requests, e.g. 503:2,hang,ok,reset,empty (see the notes at the top)')
+    args = parser.parse_args()
+    server, base_url = start(args.port, args.pages_dir, args.delay, faults=args.faults)
+    print('Serving {} (Ctrl-C to stop)'.format(base_url))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+# ============================================================================
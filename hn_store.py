@@ -0,0 +1,163 @@
+#!/usr/bin/env  python3
+# coding: utf-8
+# vim: autoindent tabstop=4 shiftwidth=4 expandtab softtabstop=4 filetype=python textwidth=220
+
+""" ===========================================================================
+         file: /mnt/Vancouver/programming/python/scripts/hn_store.py
+        about: persistent story store for hn.py (SQLite): every scraped story, points / comments snapshots, "seen since last run" diffs
+        title: Hacker News Scraper story store
+       author: Victoria A. Stuart
+      created: 2026-10-18
+      version: 03
+last modified: 2026-10-18
+
+   Notes: I program in Vim with textwidth=220
+
+Versions:
+    * v01 : StoryStore: WAL mode; stories (item id primary key, first_seen index), snapshots, runs; one transaction per run
+    * v02 : threads table (hn_comments.py results), keyed by the listing's comment count at fetch time
+    * v03 : fingerprints table (hn.py change detection: settings, page and kept-story digests of the last run)
+
+See also:
+    * /mnt/Vancouver/programming/python/scripts/hn.py     ## << replaces /tmp/old_date
+
+Tables:
+
+    stories   : id (HN item id, primary key) | title | href | first_seen | last_seen | points | comments   (latest values)
+    snapshots : id | seen | points | comments     -- one row when a story is first seen and whenever its points / comments change
+    runs      : run_at | stories | new | changed
+    threads   : id | fetched | comments (the listing's count when fetched) | count (live comments in the tree) | top (JSON list)
+    fingerprints : name | digest   -- replaced as a whole by save_fingerprints() (hn.py also keeps the output's banner time and new ids there)
+
+record_run() looks up the run's ids (primary key lookups), then upserts all stories, inserts the snapshots and the run row in a single
+transaction, so a run costs the same after months of history as on day one.  Times are Unix timestamps (s).
+==============================================================================
+"""
+
+import json
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id          INTEGER PRIMARY KEY,
+    title       TEXT,
+    href        TEXT,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    points      INTEGER,
+    comments    INTEGER
+);
+CREATE INDEX IF NOT EXISTS stories_first_seen ON stories (first_seen);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id          INTEGER NOT NULL,
+    seen        REAL NOT NULL,
+    points      INTEGER,
+    comments    INTEGER
+);
+CREATE INDEX IF NOT EXISTS snapshots_id_seen ON snapshots (id, seen);
+CREATE TABLE IF NOT EXISTS runs (
+    run_at      REAL PRIMARY KEY,
+    stories     INTEGER,
+    new         INTEGER,
+    changed     INTEGER
+);
+CREATE TABLE IF NOT EXISTS threads (
+    id          INTEGER PRIMARY KEY,
+    fetched     REAL NOT NULL,
+    comments    INTEGER,
+    count       INTEGER,
+    top         TEXT
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    name        TEXT PRIMARY KEY,
+    digest      TEXT
+);
+"""
+
+## new : [Story] first seen in this run | changed : [(Story, old points, old comments)] | previous_run : Unix time (None on the first run)
+RunDiff = namedtuple('RunDiff', ['new', 'changed', 'previous_run'])
+
+## SQLite limits the number of host parameters per statement:
+LOOKUP_CHUNK = 500
+
+
+class StoryStore:
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def last_run(self):
+        """ Unix time of the last recorded run, or None. """
+        row = self.db.execute('SELECT MAX(run_at) FROM runs').fetchone()
+        return row[0]
+
+    def _select(self, query, ids):
+        """ Rows of query ('... WHERE id IN ({})') for ids, in chunks of LOOKUP_CHUNK ids. """
+        ids = list(ids)
+        for i in range(0, len(ids), LOOKUP_CHUNK):
+            chunk = ids[i:i + LOOKUP_CHUNK]
+            yield from self.db.execute(query.format(','.join('?' * len(chunk))), chunk)
+
+    def lookup(self, ids):
+        """ {id: (points, comments)} for the ids already in the store. """
+        return {hn_id: (points, comments) for hn_id, points, comments in self._select('SELECT id, points, comments FROM stories WHERE id IN ({})', ids)}
+
+    def lookup_threads(self, ids):
+        """ {id: (comments, count, top)} for the ids whose thread was fetched before; comments: the listing's count at the time. """
+        return {hn_id: (comments, count, json.loads(top))
+                for hn_id, comments, count, top in self._select('SELECT id, comments, count, top FROM threads WHERE id IN ({})', ids)}
+
+    def save_threads(self, threads, now=None):
+        """ Store fetched threads: [(id, listing's comment count, count, top)]. """
+        now = time.time() if now is None else now
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO threads (id, fetched, comments, count, top) VALUES (?, ?, ?, ?, ?)',
+                                ((hn_id, now, comments, count, json.dumps(top)) for hn_id, comments, count, top in threads))
+
+    def fingerprints(self):
+        """ {name: digest}, as last saved. """
+        return dict(self.db.execute('SELECT name, digest FROM fingerprints'))
+
+    def save_fingerprints(self, fingerprints):
+        with self.db:
+            self.db.execute('DELETE FROM fingerprints')
+            self.db.executemany('INSERT INTO fingerprints (name, digest) VALUES (?, ?)', fingerprints.items())
+
+    def record_run(self, stories, now=None):
+        """ Upsert this run's stories (hn_parse.Story records); return the RunDiff against the store as it was. """
+        now = time.time() if now is None else now
+        previous_run = self.last_run()
+        known = self.lookup(int(story.id) for story in stories)
+        new, changed, snapshots = [], [], []
+        for story in stories:
+            hn_id = int(story.id)
+            if hn_id not in known:
+                new.append(story)
+            elif known[hn_id] != (story.points, story.comments):
+                changed.append((story, known[hn_id][0], known[hn_id][1]))
+            else:
+                continue
+            snapshots.append((hn_id, now, story.points, story.comments))
+        with self.db:
+            self.db.executemany("""
+                INSERT INTO stories (id, title, href, first_seen, last_seen, points, comments) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET title = excluded.title, href = excluded.href, last_seen = excluded.last_seen,
+                                               points = excluded.points, comments = excluded.comments
+                """, ((int(story.id), story.title, story.href, now, now, story.points, story.comments) for story in stories))
+            self.db.executemany('INSERT INTO snapshots (id, seen, points, comments) VALUES (?, ?, ?, ?)', snapshots)
+            self.db.execute('INSERT OR REPLACE INTO runs (run_at, stories, new, changed) VALUES (?, ?, ?, ?)',
+                            (now, len(stories), len(new), len(changed)))
+        return RunDiff(new=new, changed=changed, previous_run=previous_run)
+
+# ============================================================================